@@ -0,0 +1,193 @@
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from embedding_codec import encode_embedding, decode_embedding
+
+
+class AnswerCache:
+    """Cache of generated RAG answers for questions already asked about a document.
+
+    Exact repeats are found under the (document, retrieved chunk ids) key
+    they were answered from. Reworded questions are matched against a
+    per-document index of earlier questions: the nearest one is reused when
+    its embedding is within similarity_threshold (cosine) and at least
+    min_chunk_overlap of the new question's chunks were also its context, so
+    a slightly different top-k still hits. Both are Redis lists that expire
+    after ttl seconds; stores append atomically (RPUSH + LTRIM), so workers
+    sharing Redis never overwrite each other's answers. A local LRU keeps
+    what was read for local_ttl seconds, so other workers' answers show up
+    within that delay.
+    """
+
+    def __init__(self, redis_client=None, namespace="default", ttl=24 * 3600, similarity_threshold=0.92,
+                 min_chunk_overlap=0.5, max_local_groups=1024, max_entries_per_group=16,
+                 max_entries_per_document=64, local_ttl=5):
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.similarity_threshold = similarity_threshold
+        self.min_chunk_overlap = min_chunk_overlap
+        self.max_local_groups = max_local_groups
+        self.max_entries_per_group = max_entries_per_group
+        self.max_entries_per_document = max_entries_per_document
+        self._groups = OrderedDict()  # key -> (expires_at, entries)
+        self._lock = threading.Lock()
+        self._stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0}
+
+    # --- public API ---
+
+    def lookup(self, document_id, chunk_ids, query, query_embedding):
+        """Return (answer, kind) with kind "exact" or "semantic", or (None, None) on a miss."""
+        normalized = self._normalize_query(query)
+        for entry in self._load_group(self._key(document_id, chunk_ids)):
+            if entry['query'] == normalized:
+                self._count('exact_hits')
+                return entry['answer'], 'exact'
+
+        chunks = set(int(i) for i in chunk_ids)
+        best, best_score = None, -1.0
+        query_unit = self._unit(query_embedding)
+        for entry in self._load_group(self._document_key(document_id)):
+            if self._overlap(chunks, entry['chunk_ids']) < self.min_chunk_overlap:
+                continue
+            score = float(np.dot(query_unit, entry['embedding']))
+            if score > best_score:
+                best, best_score = entry, score
+        if best is not None and best_score >= self.similarity_threshold:
+            self._count('semantic_hits')
+            return best['answer'], 'semantic'
+        self._count('misses')
+        return None, None
+
+    def store(self, document_id, chunk_ids, query, query_embedding, answer):
+        normalized = self._normalize_query(query)
+        chunk_ids = sorted(int(i) for i in chunk_ids)
+        # Oldest questions drop out first
+        self._append(self._key(document_id, chunk_ids), self.max_entries_per_group,
+                     {'query': normalized, 'answer': answer})
+        self._append(self._document_key(document_id), self.max_entries_per_document,
+                     {'query': normalized, 'embedding': self._unit(query_embedding), 'chunk_ids': chunk_ids,
+                      'answer': answer})
+        self._count('stores')
+
+    def record_bypass(self):
+        self._count('bypassed')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_groups'] = len(self._groups)
+        lookups = stats['exact_hits'] + stats['semantic_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['exact_hits'] + stats['semantic_hits']) / lookups if lookups else 0.0
+        return stats
+
+    # --- internals ---
+
+    def _key(self, document_id, chunk_ids):
+        # The same chunks in a different rank order are the same context
+        signature = hashlib.sha256(",".join(str(i) for i in sorted(int(i) for i in chunk_ids)).encode('utf-8')).hexdigest()[:32]
+        return f"answer:v3:{self.namespace}:{document_id}:{signature}"
+
+    def _document_key(self, document_id):
+        return f"answer:v3:{self.namespace}:{document_id}:questions"
+
+    def _append(self, key, limit, new_entry):
+        if self.redis_client is not None:
+            try:
+                # One MULTI: concurrent appends from other workers are kept, not overwritten
+                pipe = self.redis_client.pipeline()
+                pipe.rpush(key, self._serialize(new_entry))
+                pipe.ltrim(key, -limit, -1)
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+                with self._lock:
+                    self._groups.pop(key, None)  # re-read with the other workers' entries
+                return
+            except Exception as e:
+                print(f"Warning: could not store answer in Redis: {e}")
+        entries = self._load_group(key) + [new_entry]
+        self._remember(key, self._latest(entries)[-limit:], self.ttl)
+
+    @staticmethod
+    def _overlap(chunks, other_chunk_ids):
+        """Share of chunks that were also in the other question's context."""
+        if not chunks:
+            return 0.0
+        return len(chunks.intersection(other_chunk_ids)) / len(chunks)
+
+    def _load_group(self, key):
+        now = time.time()
+        with self._lock:
+            cached = self._groups.get(key)
+            if cached is not None:
+                expires_at, entries = cached
+                if expires_at > now:
+                    self._groups.move_to_end(key)
+                    return entries
+                del self._groups[key]
+
+        if self.redis_client is None:
+            return []
+        try:
+            raw_entries = self.redis_client.lrange(key, 0, -1)
+        except Exception as e:
+            print(f"Warning: could not read answer cache from Redis: {e}")
+            return []
+        entries = self._latest([entry for entry in map(self._deserialize, raw_entries) if entry is not None])
+        self._remember(key, entries, self.local_ttl)
+        return entries
+
+    @staticmethod
+    def _latest(entries):
+        """entries without the older answers to a question asked again, oldest first."""
+        latest = {}
+        for entry in entries:
+            latest.pop(entry['query'], None)
+            latest[entry['query']] = entry
+        return list(latest.values())
+
+    def _remember(self, key, entries, ttl):
+        with self._lock:
+            self._groups[key] = (time.time() + ttl, entries)
+            self._groups.move_to_end(key)
+            while len(self._groups) > self.max_local_groups:
+                self._groups.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _serialize(self, entry):
+        item = {'query': entry['query'], 'answer': entry['answer']}
+        if 'embedding' in entry:
+            item['embedding'] = base64.b64encode(encode_embedding(entry['embedding'], 'float16')).decode('ascii')
+            item['chunk_ids'] = entry['chunk_ids']
+        return json.dumps(item).encode('utf-8')
+
+    def _deserialize(self, raw):
+        """The entry stored as raw, or None if it can't be decoded."""
+        item = json.loads(raw.decode('utf-8'))
+        entry = {'query': item['query'], 'answer': item['answer']}
+        if 'embedding' in item:
+            entry['embedding'] = decode_embedding(base64.b64decode(item['embedding']))
+            if entry['embedding'] is None:
+                return None
+            entry['chunk_ids'] = item['chunk_ids']
+        return entry
+
+    @staticmethod
+    def _normalize_query(query):
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype='float32').ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
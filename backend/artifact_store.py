@@ -0,0 +1,169 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+
+_ARTIFACT_ID = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_artifact_id(value):
+    return bool(value) and bool(_ARTIFACT_ID.match(value))
+
+
+class ArtifactStore:
+    """Content-addressed store for generated files (PPTX, WAV, MP4, PNG...).
+
+    Artifacts are laid out like an object store under root: the blob at
+    ab/<sha256> and its metadata at ab/<sha256>.json. Identical outputs are
+    stored once. When max_bytes is set, a running byte total is kept (counted
+    on first use), and once a put takes it past max_bytes the least recently
+    used blobs are removed until the store is back under 90% of it. Only that
+    pruning scans the store, which also resyncs the total with blobs written
+    by other processes.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # bytes of blobs on disk, counted on first use
+        os.makedirs(root, exist_ok=True)
+
+    # --- public API ---
+
+    def put_bytes(self, data, content_type='application/octet-stream', filename=None):
+        """Store data and return its metadata dict (including the blob's local 'path')."""
+        artifact_id = hashlib.sha256(data).hexdigest()
+        if not self._exists(artifact_id):
+            fd, temp_path = tempfile.mkstemp(dir=self.root, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._commit(temp_path, artifact_id, len(data))
+        return self._finish(artifact_id, len(data), content_type, filename)
+
+    def put_file(self, path, content_type='application/octet-stream', filename=None, move=False):
+        """Store the file at path (hashed in blocks, never fully in memory) and return its metadata."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        artifact_id = digest.hexdigest()
+        size = os.path.getsize(path)
+        if self._exists(artifact_id):
+            if move:
+                os.remove(path)
+        else:
+            fd, temp_path = tempfile.mkstemp(dir=self.root, suffix='.part')
+            os.close(fd)
+            if move:
+                shutil.move(path, temp_path)
+            else:
+                shutil.copyfile(path, temp_path)
+            self._commit(temp_path, artifact_id, size)
+        return self._finish(artifact_id, size, content_type, filename or os.path.basename(path))
+
+    def get(self, artifact_id):
+        """Metadata for an artifact (with its local 'path'), or None."""
+        if not is_artifact_id(artifact_id) or not self._exists(artifact_id):
+            return None
+        try:
+            with open(self._meta_path(artifact_id)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {'artifact_id': artifact_id, 'content_type': 'application/octet-stream', 'filename': None}
+        meta['size'] = os.path.getsize(self._blob_path(artifact_id))
+        meta['path'] = self._blob_path(artifact_id)
+        try:
+            os.utime(meta['path'])  # recently used
+        except OSError:
+            pass
+        return meta
+
+    def delete(self, artifact_id):
+        if not is_artifact_id(artifact_id):
+            return False
+        removed = False
+        try:
+            size = os.path.getsize(self._blob_path(artifact_id))
+            os.remove(self._blob_path(artifact_id))
+            removed = True
+            self._add_bytes(-size)
+        except OSError:
+            pass
+        try:
+            os.remove(self._meta_path(artifact_id))
+            removed = True
+        except OSError:
+            pass
+        return removed
+
+    def total_bytes(self):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, _, size in self._blobs())
+            return self._total
+
+    # --- internals ---
+
+    def _finish(self, artifact_id, size, content_type, filename):
+        meta = {'artifact_id': artifact_id, 'size': size, 'content_type': content_type, 'filename': filename}
+        with open(self._meta_path(artifact_id), 'w') as f:
+            json.dump(meta, f)
+        if self.max_bytes and self.total_bytes() > self.max_bytes:
+            self._prune(keep=artifact_id)
+        return dict(meta, path=self._blob_path(artifact_id))
+
+    def _commit(self, temp_path, artifact_id, size):
+        blob_path = self._blob_path(artifact_id)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            size -= os.path.getsize(blob_path)  # replacing a blob stored concurrently
+        except OSError:
+            pass
+        os.replace(temp_path, blob_path)  # atomic, so readers never see a partial blob
+        self._add_bytes(size)
+
+    def _add_bytes(self, size):
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+
+    def _prune(self, keep):
+        with self._lock:
+            blobs = sorted(self._blobs(), key=lambda blob: blob[1])  # oldest use first
+            total = sum(size for _, _, size in blobs)
+            target = self.max_bytes * 0.9
+            for artifact_id, _, size in blobs:
+                if total <= target:
+                    break
+                if artifact_id == keep:
+                    continue
+                for path in (self._blob_path(artifact_id), self._meta_path(artifact_id)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+            self._total = total
+
+    def _blobs(self):
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if is_artifact_id(name):
+                    stat = os.stat(os.path.join(directory, name))
+                    yield name, stat.st_mtime, stat.st_size
+
+    def _exists(self, artifact_id):
+        return os.path.exists(self._blob_path(artifact_id))
+
+    def _blob_path(self, artifact_id):
+        return os.path.join(self.root, artifact_id[:2], artifact_id)
+
+    def _meta_path(self, artifact_id):
+        return self._blob_path(artifact_id) + '.json'
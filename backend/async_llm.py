@@ -0,0 +1,218 @@
+import os
+import time
+import random
+import asyncio
+import threading
+
+import aiohttp
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# Status codes worth retrying: rate limited or transient server trouble
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMRequestError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMRateLimitError(LLMRequestError):
+    pass
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def wait_time(self):
+        """Seconds until a token is available (0 if one is available now)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds):
+        """Stop handing out tokens for a while, e.g. after a 429."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class AsyncLLMClient:
+    """asyncio client for the Gemini generateContent REST API.
+
+    One aiohttp session (and its connection pool) is shared by every call.
+    In-flight requests are capped by a semaphore, each API key has its own token
+    bucket, retryable errors back off exponentially with full jitter (honouring
+    Retry-After), and every attempt has its own timeout. base_url can point at
+    mock_llm_server.py for offline runs.
+    """
+
+    def __init__(self, api_keys, model_name="gemini-2.5-flash", base_url=GEMINI_BASE_URL, max_concurrency=16,
+                 requests_per_minute=60, timeout=60, max_retries=4, base_delay=1.0, max_delay=30.0):
+        if isinstance(api_keys, str):
+            api_keys = [api_keys]
+        self.api_keys = list(api_keys)
+        self.model_name = model_name
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {key: TokenBucket(requests_per_minute / 60.0) for key in self.api_keys}
+        self._semaphore = None
+        self._bucket_lock = None
+        self._session = None
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'timeouts': 0, 'failures': 0}
+
+    async def generate(self, prompt, generation_config=None, timeout=None):
+        """Return the response text for prompt."""
+        await self._ensure_session()
+        body = {'contents': [{'parts': [{'text': prompt}]}]}
+        if generation_config:
+            body['generationConfig'] = self._config_body(generation_config)
+
+        self.stats['calls'] += 1
+        for attempt in range(self.max_retries + 1):
+            # A slot is held only while a request is in flight: not while waiting for a
+            # key's rate limit, nor during the backoff after a failure
+            key = await self._acquire_key()
+            async with self._semaphore:
+                try:
+                    return await asyncio.wait_for(self._post(key, body), timeout or self.timeout)
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    error, retry_after = LLMRequestError("LLM call timed out", status=408), None
+                except aiohttp.ClientError as e:
+                    error, retry_after = LLMRequestError(f"LLM connection error: {e}"), None
+                except LLMRequestError as e:
+                    if e.status not in RETRYABLE_STATUS:
+                        self.stats['failures'] += 1
+                        raise
+                    error, retry_after = e, getattr(e, 'retry_after', None)
+                    if e.status == 429:
+                        self.stats['rate_limited'] += 1
+                        self._buckets[key].block(retry_after or self._backoff(attempt))
+
+            if attempt == self.max_retries:
+                self.stats['failures'] += 1
+                raise error
+            self.stats['retries'] += 1
+            await asyncio.sleep(retry_after if retry_after is not None else self._backoff(attempt))
+
+    async def generate_many(self, prompts, generation_config=None, return_exceptions=False):
+        """Run several prompts concurrently; results keep the order of prompts."""
+        return await asyncio.gather(*(self.generate(p, generation_config) for p in prompts),
+                                    return_exceptions=return_exceptions)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # --- internals ---
+
+    async def _ensure_session(self):
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._bucket_lock = asyncio.Lock()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            )
+
+    async def _acquire_key(self):
+        """Take a token from whichever key's bucket frees up first."""
+        async with self._bucket_lock:
+            while True:
+                key, wait = min(((k, b.wait_time()) for k, b in self._buckets.items()), key=lambda kw: kw[1])
+                if wait <= 0:
+                    self._buckets[key].take()
+                    return key
+                await asyncio.sleep(wait)
+
+    async def _post(self, key, body):
+        url = f"{self.base_url}/models/{self.model_name}:generateContent"
+        async with self._session.post(url, params={'key': key}, json=body) as response:
+            if response.status != 200:
+                text = await response.text()
+                error_class = LLMRateLimitError if response.status == 429 else LLMRequestError
+                error = error_class(f"LLM call failed with HTTP {response.status}: {text[:200]}",
+                                    status=response.status)
+                retry_after = response.headers.get('Retry-After')
+                error.retry_after = float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else None
+                raise error
+            data = await response.json()
+        try:
+            parts = data['candidates'][0]['content']['parts']
+        except (KeyError, IndexError):
+            raise LLMRequestError(f"LLM returned no candidates: {str(data)[:200]}")
+        return "".join(part.get('text', '') for part in parts)
+
+    def _backoff(self, attempt):
+        # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def _config_body(generation_config):
+        if not isinstance(generation_config, dict):
+            generation_config = {k: v for k, v in vars(generation_config).items() if v is not None}
+        body = {}
+        for name, value in generation_config.items():
+            head, *rest = name.split('_')
+            body[head + "".join(part.title() for part in rest)] = value
+        return body
+
+
+class AsyncLLMRunner:
+    """Runs an AsyncLLMClient on a background event loop for synchronous callers.
+
+    Flask handlers block only on a future; the calls themselves are
+    multiplexed on one loop thread instead of holding a worker thread each.
+    The loop is started on first use and restarted in a forked child (threads
+    don't survive fork), so the runner is safe to create in a preloading master.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.model_name = client.model_name
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def generate(self, prompt, generation_config=None, timeout=None):
+        return self.submit(self.client.generate(prompt, generation_config, timeout)).result()
+
+    def generate_many(self, prompts, generation_config=None, return_exceptions=False):
+        return self.submit(self.client.generate_many(prompts, generation_config, return_exceptions)).result()
+
+    def close(self):
+        if self._loop is not None and self._pid == os.getpid():
+            self.submit(self.client.close()).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                # Session, semaphore and locks belong to the old loop (or the parent process)
+                self.client._session = None
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                threading.Thread(target=self._loop.run_forever, name="async-llm", daemon=True).start()
+            return self._loop
@@ -0,0 +1,130 @@
+import wave
+import struct
+
+import numpy as np
+
+
+def read_wav(path_or_file):
+    """(int16 samples shaped (frames, channels), sample rate) of a PCM WAV file.
+
+    8, 24 and 32-bit input is converted to 16-bit.
+    """
+    with wave.open(path_or_file, 'rb') as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        raw = f.readframes(f.getnframes())
+    if width == 2:
+        samples = np.frombuffer(raw, dtype='<i2')
+    elif width == 1:
+        samples = ((np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8).astype(np.int16)
+    elif width == 3:
+        bytes3 = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        samples = (bytes3[:, 1].astype(np.uint16) | (bytes3[:, 2].astype(np.uint16) << 8)).view(np.int16)
+    elif width == 4:
+        samples = (np.frombuffer(raw, dtype='<i4') >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    return samples.reshape(-1, channels), rate
+
+
+def convert(samples, rate, target_rate, target_channels):
+    """samples resampled to target_rate (linear interpolation) with target_channels channels."""
+    channels = samples.shape[1]
+    if channels != target_channels:
+        if target_channels == 1:
+            samples = samples.mean(axis=1, keepdims=True)
+        elif channels == 1:
+            samples = np.repeat(samples, target_channels, axis=1)
+        else:
+            samples = np.repeat(samples.mean(axis=1, keepdims=True), target_channels, axis=1)
+    if rate != target_rate and len(samples):
+        frames = int(round(len(samples) * target_rate / rate))
+        positions = np.arange(frames) * (rate / target_rate)
+        source = np.arange(len(samples))
+        samples = np.column_stack([np.interp(positions, source, samples[:, c]) for c in range(samples.shape[1])])
+    if samples.dtype != np.int16:
+        samples = np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+    return samples
+
+
+def wav_header(sample_rate, channels, data_bytes=0xFFFFFFFF - 36):
+    """44-byte PCM 16-bit WAV header. The default length marks a stream of unknown length."""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', min(36 + data_bytes, 0xFFFFFFFF), b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16,
+        b'data', data_bytes
+    )
+
+
+class AudioAssembler:
+    """Joins speech segments with pauses between them into one 16-bit PCM WAV.
+
+    Segments are held as int16 arrays and converted to one output format
+    (by default the first segment's rate and channel count) as they are
+    added. Every pause refers to the same preallocated silence buffer, and
+    the WAV is written in one pass at the end.
+    """
+
+    def __init__(self, sample_rate=None, channels=None, pause_seconds=0.8):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.pause_seconds = pause_seconds
+        self._pieces = []
+        self._silence = None
+
+    def add(self, samples, rate):
+        """Append a segment (int16 array shaped (frames, channels)), preceded by a pause if not the first."""
+        if self.sample_rate is None:
+            self.sample_rate, self.channels = rate, self.channels or samples.shape[1]
+        samples = convert(samples, rate, self.sample_rate, self.channels)
+        if self._pieces and self.pause_seconds:
+            self._pieces.append(self.silence())
+        self._pieces.append(samples)
+        return samples
+
+    def add_file(self, path):
+        return self.add(*read_wav(path))
+
+    def silence(self):
+        """The pause between segments, allocated once."""
+        if self._silence is None:
+            self._silence = np.zeros((int(self.pause_seconds * self.sample_rate), self.channels), dtype=np.int16)
+        return self._silence
+
+    @property
+    def frames(self):
+        return sum(len(piece) for piece in self._pieces)
+
+    @property
+    def duration(self):
+        return self.frames / float(self.sample_rate) if self.sample_rate else 0.0
+
+    def write(self, file):
+        """Write the assembled WAV to a path or binary file object."""
+        if not self._pieces:
+            raise ValueError("No audio segments to assemble")
+        data_bytes = self.frames * self.channels * 2
+        if isinstance(file, str):
+            with open(file, 'wb') as f:
+                return self._write(f, data_bytes)
+        return self._write(file, data_bytes)
+
+    def to_bytes(self):
+        """The assembled WAV, filled into a single preallocated buffer."""
+        if not self._pieces:
+            raise ValueError("No audio segments to assemble")
+        data_bytes = self.frames * self.channels * 2
+        out = bytearray(44 + data_bytes)
+        out[:44] = wav_header(self.sample_rate, self.channels, data_bytes)
+        samples = np.frombuffer(out, dtype='<i2', offset=44).reshape(-1, self.channels)
+        offset = 0
+        for piece in self._pieces:
+            samples[offset:offset + len(piece)] = piece
+            offset += len(piece)
+        return out
+
+    def _write(self, f, data_bytes):
+        f.write(wav_header(self.sample_rate, self.channels, data_bytes))
+        for piece in self._pieces:
+            f.write(np.ascontiguousarray(piece, dtype='<i2').data)
+        return data_bytes + 44
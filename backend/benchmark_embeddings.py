@@ -0,0 +1,114 @@
+"""Parity check and throughput/RSS benchmark for the embedding backends.
+
+Run from backend/ after export_onnx.py:
+    python benchmark_embeddings.py [--sentences 2000] [--batch-size 64]
+
+Each backend runs in its own subprocess so resident memory is measured in
+isolation. Exits non-zero if the ONNX outputs drift from the PyTorch ones.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+import numpy as np
+
+MIN_COSINE = 0.999
+
+SAMPLE_SENTENCES = [
+    "Transformers use self-attention to model long-range dependencies.",
+    "We evaluate on ImageNet and report top-1 accuracy.",
+    "The proposed method reduces inference latency by 40% on CPU.",
+    "Results indicate a statistically significant improvement (p < 0.01).",
+    "Future work will explore multilingual retrieval-augmented generation.",
+    "BM25 remains a strong baseline for exact-term matching.",
+    "Short.",
+    "A much longer sentence that keeps going to exercise padding and bucketing across very "
+    "different token lengths in the same batch, which is where naive batching wastes compute.",
+]
+
+
+def run_backend(backend, num_sentences, batch_size, output_path):
+    from embedding_engine import load_embedding_model
+
+    quantized = backend == "onnx-int8"
+    start = time.time()
+    model = load_embedding_model("onnx" if backend.startswith("onnx") else "torch", quantized=quantized)
+    load_seconds = time.time() - start
+
+    sentences = [SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)] + f" ({i})" for i in range(num_sentences)]
+    model.encode(sentences[:batch_size], batch_size=batch_size)  # warm-up
+
+    start = time.time()
+    embeddings = np.asarray(model.encode(sentences, batch_size=batch_size), dtype="float32")
+    encode_seconds = time.time() - start
+    np.save(output_path, embeddings)
+
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "sentences_per_second": num_sentences / encode_seconds,
+        "peak_rss_mb": peak_rss_mb
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_backend(args.worker, args.sentences, args.batch_size, args.output)
+        return
+
+    temp_dir = tempfile.mkdtemp()
+    results = {}
+    for backend in args.backends.split(","):
+        output_path = os.path.join(temp_dir, f"{backend}.npy")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--output", output_path,
+             "--sentences", str(args.sentences), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"❌ {backend} failed:\n{proc.stderr}")
+            sys.exit(1)
+        stats = json.loads(proc.stdout.strip().splitlines()[-1])
+        stats["embeddings"] = np.load(output_path)
+        results[backend] = stats
+
+    print(f"{'backend':<12}{'load (s)':>10}{'sent/s':>12}{'peak RSS (MB)':>16}")
+    for backend, stats in results.items():
+        print(f"{backend:<12}{stats['load_seconds']:>10.2f}{stats['sentences_per_second']:>12.1f}"
+              f"{stats['peak_rss_mb']:>16.1f}")
+
+    if "torch" not in results:
+        return
+    reference = results["torch"]["embeddings"]
+    failed = False
+    for backend, stats in results.items():
+        if backend == "torch":
+            continue
+        # Both sides are L2-normalized, so the row-wise dot product is the cosine
+        cosines = (reference * stats["embeddings"]).sum(axis=1)
+        threshold = MIN_COSINE if backend == "onnx" else 0.98
+        ok = cosines.min() >= threshold
+        failed = failed or not ok
+        print(f"{'✅' if ok else '❌'} {backend} vs torch: min cosine {cosines.min():.5f}, "
+              f"mean {cosines.mean():.5f} (threshold {threshold})")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
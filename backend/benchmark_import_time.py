@@ -0,0 +1,110 @@
+"""Cold-start benchmark: time and memory it takes to import the app.
+
+Run from backend/:
+    python benchmark_import_time.py [--module ex] [--repeat 3] [--max-seconds 3]
+
+Imports the module in a fresh interpreter under `python -X importtime` and
+reports the total import time, peak RSS and the slowest imports it makes.
+Exits non-zero (for CI) if any heavy dependency that should load lazily was
+imported, or if the import took longer than --max-seconds.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# Must not be imported just by importing the app; see lazy.py and LAZY_RESOURCES in ex.py
+HEAVY_MODULES = [
+    "torch", "diffusers", "transformers", "sentence_transformers", "langchain_community",
+    "gradio_client", "pyttsx3", "pptx", "google.generativeai", "PIL", "faiss", "tokenizers"
+]
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy': [name for name in {heavy!r} if name in sys.modules]
+}}), file=sys.stdout)
+"""
+
+
+def parse_importtime(stderr, module):
+    """[(cumulative_us, package)] for the imports made directly by module, from -X importtime output."""
+    children = []
+    pending = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        depth = (len(package) - len(package.lstrip()) - 1) // 2
+        if depth == 1:
+            pending.append((int(cumulative), package.strip()))
+        elif depth == 0:
+            # Children are printed before their parent
+            if package.strip() == module:
+                children.extend(pending)
+            pending = []
+    return children
+
+
+def run_once(module):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f"Importing {module} failed")
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe['wall_seconds'] = wall
+    probe['imports'] = parse_importtime(result.stderr, module)
+    return probe
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="ex")
+    parser.add_argument("--repeat", type=int, default=3, help="runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-seconds", type=float, help="fail if the import takes longer")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    best = min((run_once(args.module) for _ in range(args.repeat)), key=lambda run: run['seconds'])
+
+    print(f"import {args.module}: {best['seconds']:.2f}s "
+          f"(interpreter start + import {best['wall_seconds']:.2f}s), peak RSS {best['max_rss_kb'] / 1024:.0f} MiB")
+    print(f"slowest imports made by {args.module}:")
+    for cumulative, package in sorted(best['imports'], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1e6:7.3f}s  {package}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                'module': args.module,
+                'seconds': best['seconds'],
+                'max_rss_kb': best['max_rss_kb'],
+                'heavy_imported': best['heavy'],
+                'imports': [{'package': p, 'cumulative_us': c} for c, p in best['imports']]
+            }, f, indent=2)
+
+    failed = False
+    if best['heavy']:
+        print(f"FAIL: imported eagerly: {', '.join(best['heavy'])}")
+        failed = True
+    if args.max_seconds is not None and best['seconds'] > args.max_seconds:
+        print(f"FAIL: import took {best['seconds']:.2f}s, budget {args.max_seconds:.2f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Load test for AsyncLLMClient against the local mock Gemini server.
+
+Run from backend/:
+    python benchmark_llm_client.py [--requests 500] [--concurrency 64] [--failure-rate 0.05] [--rpm 600]
+
+Starts mock_llm_server in-process, fires --requests generations from a
+single thread and reports throughput, latency percentiles, retries and
+429s. Exits non-zero if any request ultimately failed.
+"""
+import sys
+import time
+import socket
+import asyncio
+import argparse
+
+import numpy as np
+from aiohttp import web
+
+from async_llm import AsyncLLMClient
+from mock_llm_server import create_app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(args):
+    port = free_port()
+    runner = web.AppRunner(create_app(args.latency, args.jitter, args.failure_rate, args.rpm, seed=0))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    client = AsyncLLMClient(
+        [f"mock-key-{i}" for i in range(args.keys)],
+        model_name="mock-model",
+        base_url=f"http://127.0.0.1:{port}/v1beta",
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.client_rpm,
+        timeout=args.timeout,
+        max_retries=args.retries,
+        base_delay=0.1,
+        max_delay=2.0
+    )
+
+    latencies = []
+
+    async def one(i):
+        start = time.perf_counter()
+        await client.generate(f"Question {i}: summarize section {i % 17}")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(args.requests)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    await client.close()
+    await runner.cleanup()
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    lat = np.array(latencies) if latencies else np.zeros(1)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.keys} key(s)")
+    print(f"  wall time   {elapsed:.2f}s  ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"  latency     p50 {np.percentile(lat, 50) * 1000:.0f} ms, p95 {np.percentile(lat, 95) * 1000:.0f} ms")
+    print(f"  client      {client.stats}")
+    print(f"  failed      {len(errors)}")
+    for error in errors[:5]:
+        print(f"    {error!r}")
+    return 1 if errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--keys", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--rpm", type=int, default=0, help="server-side per-key limit (0 = unlimited)")
+    parser.add_argument("--client-rpm", type=int, default=6000, help="client-side per-key token bucket")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--retries", type=int, default=4)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import os
+import re
+import json
+from collections import namedtuple
+
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_model")
+
+# Boundary strength before a segment; higher is a better place to cut a chunk
+LINE, SENTENCE, PARAGRAPH, SECTION = 0, 1, 2, 3
+
+# Sentence ends need two word characters before the mark, so "2. Methods" or "e.g. this" stay whole
+_BOUNDARY = re.compile(r'\n[ \t\r]*\n\s*|\r?\n|(?:(?<=\w\w[.!?])|(?<=[)\]"\'][.!?]))[ \t]+')
+_HEADING = re.compile(
+    r'^(#{1,6}\s+\S.*'                          # markdown heading
+    r'|(\d+(\.\d+)*\.?|[IVX]+\.)\s+[A-Z][^.!?]{0,80}'  # "3.2 Results", "IV. Discussion"
+    r'|[A-Z][A-Z0-9 ,:&\-]{2,80})$'             # ALL CAPS HEADING
+)
+
+Segment = namedtuple("Segment", ["start", "end", "tokens", "strength"])
+Chunk = namedtuple("Chunk", ["start", "end", "tokens"])
+
+
+def is_heading(line):
+    """True if a single line of text looks like a section heading."""
+    line = line.strip()
+    return bool(line) and bool(_HEADING.match(line))
+
+
+class TokenChunker:
+    """Split text into chunks that fit the embedding model's token limit.
+
+    Chunks are returned as character offsets into the original text. Cuts
+    prefer section, then paragraph, then sentence boundaries; consecutive
+    chunks share up to overlap_tokens of trailing segments. The text is
+    scanned incrementally, so memory stays proportional to one chunk.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, max_tokens=None, overlap_tokens=40, tokenize_batch=256):
+        from tokenizers import Tokenizer
+
+        if max_tokens is None:
+            with open(os.path.join(model_dir, "sentence_bert_config.json")) as f:
+                # Leave room for [CLS] and [SEP]
+                max_tokens = json.load(f)["max_seq_length"] - 2
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 4)
+        self.tokenize_batch = tokenize_batch
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
+
+    def chunks(self, text):
+        """Yield Chunk(start, end, tokens) spans covering text."""
+        pending = []
+        total = 0
+        for segment in self._segments(text):
+            if segment.strength == SECTION and pending:
+                yield self._span(pending)
+                pending, total = [], 0
+
+            if segment.tokens > self.max_tokens:
+                if pending:
+                    yield self._span(pending)
+                    pending, total = [], 0
+                yield from self._split_long_segment(text, segment)
+                continue
+
+            while pending and total + segment.tokens > self.max_tokens:
+                cut = self._best_cut(pending)
+                yield self._span(pending[:cut])
+                rest = pending[cut:]
+                carry = self._overlap(pending[:cut])
+                if sum(s.tokens for s in carry + rest) + segment.tokens > self.max_tokens:
+                    # No room for the overlap next to what is left
+                    carry = []
+                pending = carry + rest
+                total = sum(s.tokens for s in pending)
+
+            pending.append(segment)
+            total += segment.tokens
+
+        if pending:
+            yield self._span(pending)
+
+    def _segments(self, text):
+        """Yield non-empty Segments between boundaries, tokenized in batches."""
+        batch = []
+        position = 0
+        strength = SECTION
+        for match in _BOUNDARY.finditer(text):
+            batch.append((position, match.start(), strength))
+            position = match.end()
+            separator = match.group()
+            if separator.count("\n") >= 2:
+                strength = PARAGRAPH
+            elif "\n" in separator:
+                strength = LINE
+            else:
+                strength = SENTENCE
+            if len(batch) >= self.tokenize_batch:
+                yield from self._tokenize(text, batch)
+                batch = []
+        batch.append((position, len(text), strength))
+        yield from self._tokenize(text, batch)
+
+    def _tokenize(self, text, batch):
+        pieces = []
+        for start, end, strength in batch:
+            # Trim surrounding whitespace so spans start and end on content
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start < end:
+                pieces.append((start, end, strength))
+        if not pieces:
+            return
+
+        encodings = self.tokenizer.encode_batch([text[s:e] for s, e, _ in pieces], add_special_tokens=False)
+        previous_end = None
+        for (start, end, strength), encoding in zip(pieces, encodings):
+            segment_text = text[start:end]
+            if strength == LINE and previous_end is not None and text[previous_end - 1] in ".!?":
+                strength = SENTENCE
+            if strength in (LINE, PARAGRAPH) and "\n" not in segment_text and _HEADING.match(segment_text):
+                strength = SECTION
+            previous_end = end
+            yield Segment(start, end, len(encoding.ids), strength)
+
+    def _best_cut(self, pending):
+        """Index to cut pending at: the strongest boundary in the second half, else everything."""
+        best, best_strength = len(pending), -1
+        running = 0
+        for i, segment in enumerate(pending):
+            if i > 0 and running >= self.max_tokens // 2 and segment.strength >= best_strength:
+                best, best_strength = i, segment.strength
+            running += segment.tokens
+        return best
+
+    def _overlap(self, emitted):
+        """Trailing segments of the emitted chunk to repeat at the start of the next one."""
+        carry = []
+        tokens = 0
+        for segment in reversed(emitted[1:]):
+            if tokens + segment.tokens > self.overlap_tokens:
+                break
+            carry.insert(0, segment)
+            tokens += segment.tokens
+        return carry
+
+    def _span(self, segments):
+        return Chunk(segments[0].start, segments[-1].end, sum(s.tokens for s in segments))
+
+    def _split_long_segment(self, text, segment):
+        """Window a segment that alone exceeds the limit, cutting on token offsets."""
+        offsets = self.tokenizer.encode(text[segment.start:segment.end], add_special_tokens=False).offsets
+        step = self.max_tokens - self.overlap_tokens
+        for first in range(0, len(offsets), step):
+            window = offsets[first:first + self.max_tokens]
+            yield Chunk(segment.start + window[0][0], segment.start + window[-1][1], len(window))
+            if first + self.max_tokens >= len(offsets):
+                break
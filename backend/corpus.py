@@ -0,0 +1,184 @@
+import bisect
+import datetime
+import threading
+from collections import OrderedDict
+
+from lazy import lazy_import
+from vector_index import normalize_rows
+from sparse_index import BM25Index, fuse_rankings
+
+faiss = lazy_import("faiss")
+
+
+class UserCorpus:
+    """One user's library searched as a single faiss.IndexShards, one shard per document.
+
+    Shards are the per-document indexes from the DocumentStore, so adding a
+    document only embeds that document and removing one just drops its shard.
+    The documents' BM25 segments are kept in the same order, so dense and
+    sparse results share one id space.
+    """
+
+    def __init__(self, username):
+        self.username = username
+        self.documents = OrderedDict()  # document_id -> {'title', 'entry'}
+        self.shards = None
+        self.sparse = BM25Index()
+        self._lock = threading.RLock()
+
+    def add(self, entry, title):
+        with self._lock:
+            if entry['document_id'] in self.documents:
+                return False
+            if self.shards is None:
+                # threaded search across shards; ids are offset by the preceding shards' sizes
+                self.shards = faiss.IndexShards(entry['index'].d, True, True)
+            self.shards.add_shard(entry['index'])
+            self.sparse.add_segment(entry['sparse'].segments[0])
+            self.documents[entry['document_id']] = {'title': title, 'entry': entry}
+            return True
+
+    def remove(self, document_id):
+        with self._lock:
+            doc = self.documents.pop(document_id, None)
+            if doc is None:
+                return False
+            self.shards.remove_shard(doc['entry']['index'])
+            self.sparse.remove_segment(doc['entry']['sparse'].segments[0])
+            if not self.documents:
+                self.shards = None
+            return True
+
+    def search(self, query_embedding, top_k=5, query=None, dense_weight=1.0, sparse_weight=1.0, fusion="rrf"):
+        """Return the top_k chunks across every document, with provenance.
+
+        When query text is given, dense and BM25 rankings are fused.
+        """
+        with self._lock:
+            if self.shards is None or self.shards.ntotal == 0:
+                return []
+            hybrid = query is not None and sparse_weight > 0
+            candidates = max(top_k * 4, 20) if hybrid else top_k
+            scores, ids = self.shards.search(normalize_rows(query_embedding), candidates)
+            keep = ids[0] >= 0
+            dense = (scores[0][keep], ids[0][keep])
+            if hybrid:
+                sparse = self.sparse.search(query, candidates)
+                dense_scores = dict(zip(dense[1].tolist(), dense[0].tolist()))
+                ranked = fuse_rankings(dense, sparse, dense_weight, sparse_weight, fusion)[:top_k]
+                hits = [(dense_scores.get(i), i) for i in ranked]
+            else:
+                hits = list(zip(dense[0].tolist(), dense[1].tolist()))
+            docs = list(self.documents.items())
+            offsets = []
+            total = 0
+            for _, doc in docs:
+                offsets.append(total)
+                total += doc['entry']['index'].ntotal
+
+        results = []
+        for score, global_id in hits:
+            shard = bisect.bisect_right(offsets, global_id) - 1
+            document_id, doc = docs[shard]
+            chunk_index = int(global_id - offsets[shard])
+            pages = doc['entry'].get('pages')
+            results.append({
+                'document_id': document_id,
+                'title': doc['title'],
+                'page': pages[chunk_index] if pages else None,
+                'chunk_index': chunk_index,
+                'text': doc['entry']['chunks'][chunk_index],
+                'score': score
+            })
+        return results
+
+
+class CorpusManager:
+    """Per-user corpora backed by a Mongo collection of document metadata and the DocumentStore.
+
+    The collection keeps each document's text so an index that fell out of
+    every DocumentStore tier can be rebuilt. Loaded corpora are kept in an LRU.
+    """
+
+    def __init__(self, document_store, collection, build_index, prepare_index=None, max_users_in_memory=64):
+        self.document_store = document_store
+        self.collection = collection
+        self.build_index = build_index
+        self.prepare_index = prepare_index
+        self.max_users_in_memory = max_users_in_memory
+        self._corpora = OrderedDict()
+        self._lock = threading.Lock()
+        self._collection_indexed = False
+
+    def add_document(self, username, text, title):
+        """Index text (if new) and attach it to the user's library. Returns (document_id, added)."""
+        if not self._collection_indexed:
+            self.collection.create_index([("username", 1), ("document_id", 1)], unique=True)
+            self._collection_indexed = True
+        entry = self._load_entry(text)
+        corpus = self._corpus(username)
+        added = corpus.add(entry, title)
+        if added:
+            self.collection.update_one(
+                {"username": username, "document_id": entry['document_id']},
+                {"$setOnInsert": {
+                    "title": title,
+                    "text": text,
+                    "num_chunks": len(entry['chunks']),
+                    "added_at": datetime.datetime.utcnow()
+                }},
+                upsert=True
+            )
+        return entry['document_id'], added
+
+    def remove_document(self, username, document_id):
+        removed = self._corpus(username).remove(document_id)
+        result = self.collection.delete_one({"username": username, "document_id": document_id})
+        return removed or result.deleted_count > 0
+
+    def list_documents(self, username):
+        cursor = self.collection.find({"username": username}, {"text": 0, "_id": 0}).sort("added_at", 1)
+        return [
+            {
+                'document_id': doc['document_id'],
+                'title': doc.get('title'),
+                'num_chunks': doc.get('num_chunks'),
+                'added_at': doc['added_at'].isoformat() if doc.get('added_at') else None
+            }
+            for doc in cursor
+        ]
+
+    def search(self, username, query_embedding, top_k=5, **kwargs):
+        return self._corpus(username).search(query_embedding, top_k, **kwargs)
+
+    def _load_entry(self, text):
+        entry = self.document_store.register(text, self.build_index)
+        if self.prepare_index:
+            self.prepare_index(entry['index'])
+        return entry
+
+    def _corpus(self, username):
+        with self._lock:
+            corpus = self._corpora.get(username)
+            if corpus is not None:
+                self._corpora.move_to_end(username)
+                return corpus
+            corpus = UserCorpus(username)
+            # Hold the corpus lock until it is loaded so concurrent requests wait for it
+            corpus._lock.acquire()
+            self._corpora[username] = corpus
+            while len(self._corpora) > self.max_users_in_memory:
+                self._corpora.popitem(last=False)
+
+        try:
+            # First use since start-up (or eviction): reattach every stored document
+            for doc in self.collection.find({"username": username}).sort("added_at", 1):
+                entry = self.document_store.get(doc['document_id'])
+                if entry is None:
+                    entry = self._load_entry(doc['text'])
+                elif self.prepare_index:
+                    self.prepare_index(entry['index'])
+                corpus.add(entry, doc.get('title'))
+        finally:
+            corpus._lock.release()
+        return corpus
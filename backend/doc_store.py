@@ -0,0 +1,219 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from lazy import lazy_import
+from sparse_index import BM25Index, PostingsSegment
+
+faiss = lazy_import("faiss")
+
+_DOCUMENT_ID = re.compile(r'[0-9a-f]{64}')
+
+
+def is_document_id(value):
+    """True for a well-formed id (a sha256 hex digest), the only kind ever joined into a path."""
+    return isinstance(value, str) and bool(_DOCUMENT_ID.fullmatch(value))
+
+
+def document_id_for_text(text):
+    """Content hash used as the id of a registered document."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class DocumentStore:
+    """Registry of chunked + indexed documents keyed by content hash.
+
+    Each entry carries the dense FAISS index and a BM25 index over the same
+    chunks. Entries live in a small in-memory LRU. Evicted (and freshly built) entries
+    are spilled to Redis and, if configured, to a local directory so that a
+    later question only needs the document id to get a ready-made index.
+    """
+
+    def __init__(self, redis_client=None, max_in_memory=16, spill_dir=None, redis_ttl=7 * 24 * 3600):
+        self.redis_client = redis_client
+        self.max_in_memory = max_in_memory
+        self.spill_dir = spill_dir
+        self.redis_ttl = redis_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._build_locks = {}  # document id -> [lock, callers using it]
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # --- public API ---
+
+    def register(self, document_text, build_index):
+        """Return the entry for document_text, building it once if unknown.
+
+        build_index(document_text) must return (index, chunks) or
+        (index, chunks, pages) where pages holds the page number of each chunk.
+        """
+        document_id = document_id_for_text(document_text)
+        entry = self.get(document_id)
+        if entry is not None:
+            return entry
+
+        # Serialize concurrent builds of the same document; the lock is dropped with its last user
+        with self._lock:
+            build_lock = self._build_locks.setdefault(document_id, [threading.Lock(), 0])
+            build_lock[1] += 1
+        try:
+            with build_lock[0]:
+                entry = self.get(document_id)
+                if entry is None:
+                    built = build_index(document_text)
+                    index, chunks = built[0], built[1]
+                    pages = built[2] if len(built) > 2 else None
+                    entry = {
+                        'document_id': document_id,
+                        'index': index,
+                        'sparse': BM25Index.from_texts(chunks),
+                        'chunks': chunks,
+                        'pages': pages
+                    }
+                    self._remember(entry)
+                    self._spill(entry)
+        finally:
+            with self._lock:
+                build_lock[1] -= 1
+                if not build_lock[1]:
+                    del self._build_locks[document_id]
+        return entry
+
+    def get(self, document_id):
+        """Look up a document by id: memory first, then Redis, then disk. Malformed ids find nothing."""
+        if not is_document_id(document_id):
+            return None
+        with self._lock:
+            entry = self._entries.get(document_id)
+            if entry is not None:
+                self._entries.move_to_end(document_id)
+                return entry
+
+        entry = self._load_from_redis(document_id) or self._load_from_disk(document_id)
+        if entry is not None:
+            self._remember(entry)
+        return entry
+
+    def forget(self, document_id):
+        """Drop a document from every tier."""
+        if not is_document_id(document_id):
+            return
+        with self._lock:
+            self._entries.pop(document_id, None)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(self._redis_key(document_id, 'chunks'),
+                                         self._redis_key(document_id, 'index'),
+                                         self._redis_key(document_id, 'sparse'))
+            except Exception as e:
+                print(f"Warning: could not delete document {document_id} from Redis: {e}")
+        if self.spill_dir:
+            for path in self._disk_paths(document_id):
+                if os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    # --- internals ---
+
+    def _remember(self, entry):
+        with self._lock:
+            self._entries[entry['document_id']] = entry
+            self._entries.move_to_end(entry['document_id'])
+            while len(self._entries) > self.max_in_memory:
+                self._entries.popitem(last=False)
+
+    def _spill(self, entry):
+        index_bytes = faiss.serialize_index(entry['index']).tobytes()
+        chunks_bytes = json.dumps({'chunks': entry['chunks'], 'pages': entry.get('pages')}).encode('utf-8')
+        sparse_bytes = entry['sparse'].segments[0].to_bytes()
+
+        if self.redis_client is not None:
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.set(self._redis_key(entry['document_id'], 'chunks'), chunks_bytes, ex=self.redis_ttl)
+                pipe.set(self._redis_key(entry['document_id'], 'index'), index_bytes, ex=self.redis_ttl)
+                pipe.set(self._redis_key(entry['document_id'], 'sparse'), sparse_bytes, ex=self.redis_ttl)
+                pipe.execute()
+            except Exception as e:
+                print(f"Warning: could not spill document {entry['document_id']} to Redis: {e}")
+
+        if self.spill_dir:
+            chunks_path, index_path, sparse_path = self._disk_paths(entry['document_id'])
+            try:
+                with open(chunks_path, 'wb') as f:
+                    f.write(chunks_bytes)
+                with open(index_path, 'wb') as f:
+                    f.write(index_bytes)
+                with open(sparse_path, 'wb') as f:
+                    f.write(sparse_bytes)
+            except OSError as e:
+                print(f"Warning: could not spill document {entry['document_id']} to disk: {e}")
+
+    def _load_from_redis(self, document_id):
+        if self.redis_client is None:
+            return None
+        try:
+            chunks_bytes, index_bytes, sparse_bytes = self.redis_client.mget(
+                self._redis_key(document_id, 'chunks'),
+                self._redis_key(document_id, 'index'),
+                self._redis_key(document_id, 'sparse')
+            )
+        except Exception as e:
+            print(f"Warning: could not read document {document_id} from Redis: {e}")
+            return None
+        if not chunks_bytes or not index_bytes:
+            return None
+        return self._deserialize(document_id, chunks_bytes, index_bytes, sparse_bytes)
+
+    def _load_from_disk(self, document_id):
+        if not self.spill_dir:
+            return None
+        chunks_path, index_path, sparse_path = self._disk_paths(document_id)
+        if not (os.path.exists(chunks_path) and os.path.exists(index_path)):
+            return None
+        with open(chunks_path, 'rb') as f:
+            chunks_bytes = f.read()
+        with open(index_path, 'rb') as f:
+            index_bytes = f.read()
+        sparse_bytes = None
+        if os.path.exists(sparse_path):
+            with open(sparse_path, 'rb') as f:
+                sparse_bytes = f.read()
+        return self._deserialize(document_id, chunks_bytes, index_bytes, sparse_bytes)
+
+    def _deserialize(self, document_id, chunks_bytes, index_bytes, sparse_bytes=None):
+        stored = json.loads(chunks_bytes.decode('utf-8'))
+        # Older spills stored the bare chunk list
+        if isinstance(stored, list):
+            stored = {'chunks': stored, 'pages': None}
+        index = faiss.deserialize_index(np.frombuffer(index_bytes, dtype='uint8'))
+        # Spills from before hybrid retrieval have no sparse part; it is cheap to rebuild
+        if sparse_bytes:
+            sparse = BM25Index([PostingsSegment.from_bytes(sparse_bytes)])
+        else:
+            sparse = BM25Index.from_texts(stored['chunks'])
+        return {
+            'document_id': document_id,
+            'index': index,
+            'sparse': sparse,
+            'chunks': stored['chunks'],
+            'pages': stored['pages']
+        }
+
+    def _redis_key(self, document_id, part):
+        return f"doc:{document_id}:{part}"
+
+    def _disk_paths(self, document_id):
+        if not is_document_id(document_id):
+            raise ValueError(f"Invalid document id: {document_id!r}")
+        return (os.path.join(self.spill_dir, f"{document_id}.chunks.json"),
+                os.path.join(self.spill_dir, f"{document_id}.faiss"),
+                os.path.join(self.spill_dir, f"{document_id}.bm25.npz"))
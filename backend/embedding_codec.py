@@ -0,0 +1,101 @@
+import io
+import pickle
+import struct
+import hashlib
+
+import numpy as np
+
+# Layout: magic(2) | version(1) | dtype code(1) | dim(uint32) | [scale(float32) for int8] | payload
+MAGIC = b'EV'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<2sBBI')
+_SCALE = struct.Struct('<f')
+
+DTYPE_CODES = {'float32': 0, 'float16': 1, 'int8': 2}
+_CODE_DTYPES = {code: name for name, code in DTYPE_CODES.items()}
+
+
+def embedding_cache_key(text, model_name, dim):
+    """Redis key for an embedding; includes model and dimension so a model swap never reads stale vectors."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"embed:v{FORMAT_VERSION}:{model_name}:{dim}:{digest}"
+
+
+def legacy_cache_key(text):
+    """Key used by the old pickle-based cache."""
+    return "embed:" + hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def encode_embedding(vector, dtype='float32'):
+    """Serialize a 1-D embedding to the compact binary format."""
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    vector = np.asarray(vector, dtype='float32').ravel()
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, DTYPE_CODES[dtype], vector.shape[0])
+
+    if dtype == 'float32':
+        return header + vector.tobytes()
+    if dtype == 'float16':
+        return header + vector.astype('float16').tobytes()
+
+    # Symmetric per-vector int8 quantization
+    max_abs = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    quantized = np.clip(np.rint(vector / scale), -127, 127).astype('int8')
+    return header + _SCALE.pack(scale) + quantized.tobytes()
+
+
+def decode_embedding(raw):
+    """Decode bytes written by encode_embedding into a float32 vector.
+
+    float32 entries are returned as a read-only view over raw (no copy).
+    Returns None for anything that is not in this format (e.g. legacy pickles).
+    """
+    if not raw or len(raw) < _HEADER.size:
+        return None
+    magic, version, code, dim = _HEADER.unpack_from(raw)
+    if magic != MAGIC or version != FORMAT_VERSION or code not in _CODE_DTYPES:
+        return None
+
+    dtype = _CODE_DTYPES[code]
+    if dtype == 'float32':
+        if len(raw) != _HEADER.size + dim * 4:
+            return None
+        return np.frombuffer(raw, dtype='float32', count=dim, offset=_HEADER.size)
+    if dtype == 'float16':
+        if len(raw) != _HEADER.size + dim * 2:
+            return None
+        return np.frombuffer(raw, dtype='float16', count=dim, offset=_HEADER.size).astype('float32')
+
+    if len(raw) != _HEADER.size + _SCALE.size + dim:
+        return None
+    (scale,) = _SCALE.unpack_from(raw, _HEADER.size)
+    quantized = np.frombuffer(raw, dtype='int8', count=dim, offset=_HEADER.size + _SCALE.size)
+    return quantized.astype('float32') * scale
+
+
+class _NumpyOnlyUnpickler(pickle.Unpickler):
+    """Unpickler that refuses anything but plain numpy arrays."""
+
+    _allowed = {
+        ('numpy', 'ndarray'),
+        ('numpy', 'dtype'),
+        ('numpy.core.multiarray', '_reconstruct'),
+        ('numpy._core.multiarray', '_reconstruct'),
+    }
+
+    def find_class(self, module, name):
+        if (module, name) in self._allowed:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Refusing to unpickle {module}.{name}")
+
+
+def decode_legacy_pickle(raw, dim):
+    """Load an old pickled embedding, returning None if it is not a numpy vector of the expected size."""
+    try:
+        value = _NumpyOnlyUnpickler(io.BytesIO(raw)).load()
+    except Exception:
+        return None
+    if not isinstance(value, np.ndarray) or value.size != dim:
+        return None
+    return value.astype('float32').ravel()
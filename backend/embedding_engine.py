@@ -0,0 +1,116 @@
+import os
+import json
+
+import numpy as np
+
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_model")
+
+
+def quantize_onnx_model(model_dir=ONNX_MODEL_DIR):
+    """Write an int8 dynamically-quantized copy of model.onnx next to it and return its path."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    source = os.path.join(model_dir, "model.onnx")
+    target = os.path.join(model_dir, "model_quant.onnx")
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source):
+        quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    return target
+
+
+class OnnxEmbeddingEngine:
+    """Sentence embeddings from the exported MiniLM graph on onnxruntime (CPU).
+
+    Mirrors the SentenceTransformer pipeline in onnx_model/modules.json:
+    transformer -> mean pooling (1_Pooling) -> L2 normalize (2_Normalize).
+    Exposes the subset of the SentenceTransformer API that ex.py uses.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=False, intra_op_threads=None, max_batch_tokens=8192):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_dir = model_dir
+        self.max_batch_tokens = max_batch_tokens
+
+        with open(os.path.join(model_dir, "sentence_bert_config.json")) as f:
+            self.max_seq_length = json.load(f)["max_seq_length"]
+        with open(os.path.join(model_dir, "1_Pooling", "config.json")) as f:
+            pooling = json.load(f)
+        if not pooling.get("pooling_mode_mean_tokens"):
+            raise ValueError("Only mean pooling is supported by the ONNX engine")
+        self.dimension = pooling["word_embedding_dimension"]
+        with open(os.path.join(model_dir, "modules.json")) as f:
+            self.normalize = any(m["type"].endswith("Normalize") for m in json.load(f))
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.no_padding()
+        self.pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+
+        model_path = quantize_onnx_model(model_dir) if quantized else os.path.join(model_dir, "model.onnx")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        """Embed a list of sentences; returns a float32 array of shape (n, dim)."""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        if not sentences:
+            return np.zeros((0, self.dimension), dtype="float32")
+
+        encodings = self.tokenizer.encode_batch(list(sentences))
+        # Bucket by token length so each batch is padded only to its own longest row
+        order = sorted(range(len(encodings)), key=lambda i: len(encodings[i].ids))
+        output = np.empty((len(encodings), self.dimension), dtype="float32")
+
+        start = 0
+        while start < len(order):
+            end = start + 1
+            # Grow the batch while it stays within both the row and padded-token budgets
+            while (end < len(order) and end - start < batch_size and
+                   (end - start + 1) * len(encodings[order[end]].ids) <= self.max_batch_tokens):
+                end += 1
+            batch = order[start:end]
+            output[batch] = self._embed_batch([encodings[i] for i in batch])
+            start = end
+        return output
+
+    def _embed_batch(self, encodings):
+        seq_len = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(encodings), seq_len), self.pad_id, dtype="int64")
+        attention_mask = np.zeros((len(encodings), seq_len), dtype="int64")
+        for row, e in enumerate(encodings):
+            input_ids[row, :len(e.ids)] = e.ids
+            attention_mask[row, :len(e.ids)] = 1
+
+        hidden = self.session.run(["last_hidden_state"], {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask
+        })[0]
+
+        # Mean pooling over real tokens only
+        mask = attention_mask[:, :, None].astype("float32")
+        summed = (hidden * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+
+        if self.normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+        return pooled.astype("float32")
+
+
+def load_embedding_model(backend="torch", model_name="all-MiniLM-L6-v2", quantized=False):
+    """Return the embedding engine for the configured backend ("torch" or "onnx")."""
+    if backend == "onnx":
+        return OnnxEmbeddingEngine(quantized=quantized)
+    if backend != "torch":
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
@@ -0,0 +1,54 @@
+import time
+import hashlib
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeResponse:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    @property
+    def text(self):
+        return "".join(chunk.text for chunk in self._chunks)
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+
+class FakeGenerativeModel:
+    """Offline stand-in for genai.GenerativeModel (set LLM_BACKEND=fake).
+
+    Produces a deterministic answer derived from the prompt, split into
+    word-sized stream chunks with a configurable delay, so streaming and
+    caching paths can be exercised without network access or an API key.
+    """
+
+    def __init__(self, model_name="fake-llm", first_token_delay=0.3, token_delay=0.02, words=60):
+        self.model_name = model_name
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.words = words
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        words = self._answer(prompt).split(" ")
+        chunks = [_FakeChunk(word + " ") for word in words]
+        if stream:
+            return self._stream(chunks)
+        time.sleep(self.first_token_delay + self.token_delay * len(chunks))
+        return _FakeResponse(chunks)
+
+    def _stream(self, chunks):
+        time.sleep(self.first_token_delay)
+        for chunk in chunks:
+            yield chunk
+            time.sleep(self.token_delay)
+
+    def _answer(self, prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        filler = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+        body = [filler[int(digest[i % len(digest)], 16) % len(filler)] for i in range(self.words)]
+        return f"[fake answer {digest[:8]}] " + " ".join(body)
@@ -0,0 +1,60 @@
+import math
+import time
+import wave
+import struct
+
+
+class _FakeVoice:
+    def __init__(self, voice_id, name):
+        self.id = voice_id
+        self.name = name
+
+
+class FakeTTSEngine:
+    """Offline stand-in for a pyttsx3 engine (set TTS_BACKEND=fake).
+
+    save_to_file() + runAndWait() write a mono 16-bit WAV whose length
+    follows the word count and speaking rate, keeping a CPU busy for `cost`
+    seconds per second of audio like a real synthesizer, so the TTS pool can
+    be exercised and timed without a speech driver.
+    """
+
+    def __init__(self, sample_rate=22050, cost=0.05):
+        self.sample_rate = sample_rate
+        self.cost = cost
+        self._properties = {'rate': 200, 'volume': 1.0, 'voice': 'fake-voice-0'}
+        self._voices = [_FakeVoice('fake-voice-0', 'Fake Low'), _FakeVoice('fake-voice-1', 'Fake High')]
+        self._queue = []
+
+    def getProperty(self, name):
+        if name == 'voices':
+            return self._voices
+        return self._properties[name]
+
+    def setProperty(self, name, value):
+        self._properties[name] = value
+
+    def save_to_file(self, text, path):
+        self._queue.append((text, path, dict(self._properties)))
+
+    def runAndWait(self):
+        queue, self._queue = self._queue, []
+        for text, path, properties in queue:
+            self._write(text, path, properties)
+
+    def _write(self, text, path, properties):
+        words = max(1, len(text.split()))
+        seconds = words * 60.0 / max(1, properties['rate'])
+        deadline = time.perf_counter() + seconds * self.cost
+        while time.perf_counter() < deadline:
+            pass
+        pitch = 180.0 if properties['voice'].endswith('1') else 110.0
+        amplitude = int(8000 * properties['volume'])
+        frames = bytearray()
+        for i in range(int(seconds * self.sample_rate)):
+            frames += struct.pack('<h', int(amplitude * math.sin(2 * math.pi * pitch * i / self.sample_rate)))
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(bytes(frames))
@@ -0,0 +1,37 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# The app is imported once in the master, the models of its SERVICE_ROLES (or
+# PRELOAD_MODELS) are loaded there, and the workers are forked from it, so
+# model weights are shared copy-on-write instead of loaded per worker. See
+# DEPLOYMENT.md for roles, tuning and measure_worker_memory.py.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+preload_app = True
+
+# Requests spend most of their time waiting on Gemini, Redis and Mongo, so a
+# few processes with several threads each go further than many processes.
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+# Video and comic renders can take minutes when run synchronously
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 300))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so copy-on-write pages dirtied over time are given back
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # Threads don't survive fork, and torch/OpenMP thread pools must not be
+    # started in the master, so every worker warms up on its own; /readyz
+    # answers 503 until that has finished.
+    import ex
+    ex.start_warm_up()
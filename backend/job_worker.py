@@ -0,0 +1,46 @@
+"""Runs the render jobs queued through POST /jobs/<type>, outside the web workers.
+
+Run from backend/ (next to the web servers, with the same Redis, ARTIFACT_DIR
+and JOB_LIMIT_* settings):
+    python job_worker.py [--types video,comic,audio] [--threads N]
+
+Each job type may run at most JOB_LIMIT_<TYPE> jobs at a time across every
+worker process. Run one process per type (--types video, ...) to keep a
+CPU-bound renderer off the cores and interpreter of the others. SIGTERM or
+Ctrl-C stops taking new jobs and waits for the running ones; the jobs of a
+worker that dies are marked failed once their heartbeat goes stale.
+"""
+import os
+import sys
+import signal
+import argparse
+import threading
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--types", help="comma separated job types (default: all)")
+    parser.add_argument("--threads", type=int, help="jobs run at once by this process (default: sum of the limits)")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # templates are looked up relative to backend/
+    import ex
+
+    job_types = args.types.split(",") if args.types else list(ex.JOB_RENDERERS)
+    unknown = [job_type for job_type in job_types if job_type not in ex.JOB_RENDERERS]
+    if unknown:
+        parser.error(f"Unknown job type(s) {unknown}, expected some of {', '.join(ex.JOB_RENDERERS)}")
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    print(f"Job worker {os.getpid()} running {', '.join(job_types)} jobs")
+    ex.job_manager.run_worker(ex.JOB_RENDERERS, job_types, threads=args.threads, stop=stop)
+    ex.tts_pool.close()
+    print(f"Job worker {os.getpid()} stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+import json
+import time
+import uuid
+import threading
+
+from redis.exceptions import WatchError
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_current = threading.local()
+
+
+class JobCancelled(BaseException):
+    """Raised inside a cancelled job; a BaseException so route-level `except Exception` blocks let it through."""
+
+
+class JobQueueError(Exception):
+    pass
+
+
+def report_progress(percent, message=None):
+    """Record progress of the job running on this thread and stop it if it was cancelled.
+
+    A no-op outside a job, so long-running helpers can call it unconditionally.
+    """
+    job = getattr(_current, 'job', None)
+    if job is not None:
+        job.manager._progress(job, percent, message)
+
+
+class _RunningJob:
+    def __init__(self, manager, job_id):
+        self.manager = manager
+        self.job_id = job_id
+        self.cancelled = threading.Event()
+        self.last_cancel_check = 0.0
+
+
+class JobManager:
+    """Background render jobs, queued in Redis and run by separate worker processes.
+
+    submit() stores the job record and pushes a JSON spec (type and
+    parameters) onto the type's Redis list; web processes never run renders.
+    Workers (job_worker.py) pop specs and call the renderer registered for
+    the type. Per-type limits hold across the whole deployment: a worker
+    leases one of the type's `limit` slots in Redis before taking a job.
+    While a job runs its worker refreshes a heartbeat, and a running record
+    whose heartbeat is older than stale_after seconds is marked failed when
+    it is next read, so the jobs of a killed or recycled worker don't stay
+    "running" forever. Cancellation is cooperative: running jobs stop at
+    their next report_progress() call.
+
+    Web and worker processes write the same jobs, so records are Redis
+    hashes updated a field at a time, never read-modified-written whole.
+    Status changes that race (a worker claiming a queued job that is being
+    cancelled, a stale job being reaped) are compare-and-set transactions,
+    and a cancel request lives in its own key that workers only read.
+    """
+
+    def __init__(self, redis_client, limits=None, default_limit=1, ttl=24 * 3600, heartbeat_interval=10,
+                 stale_after=60):
+        self.redis_client = redis_client
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+
+    # --- public API ---
+
+    def submit(self, job_type, params, dedupe_key=None):
+        """Queue a job of job_type with JSON-serializable params and return its id.
+
+        With a dedupe_key, find_by_key(dedupe_key) returns this job until it fails or is cancelled.
+        """
+        job_id = self._create(job_type)
+        try:
+            self.redis_client.lpush(self._queue_key(job_type),
+                                    json.dumps({'job_id': job_id, 'params': params}).encode('utf-8'))
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=f"Job queue unavailable: {e}", finished_at=time.time())
+            raise JobQueueError(f"Job queue unavailable: {e}")
+        if dedupe_key:
+            self.redis_client.set(self._dedupe_key(dedupe_key), job_id.encode('ascii'), ex=self.ttl)
+        return job_id
+
+    def submit_finished(self, job_type, result):
+        """Store a job that already succeeded with result (e.g. served from a render cache) and return its id."""
+        now = time.time()
+        return self._create(job_type, status=SUCCEEDED, progress=100, started_at=now, finished_at=now,
+                            result=result)
+
+    def get(self, job_id):
+        return self._reap(self._load(job_id))
+
+    def find_by_key(self, dedupe_key):
+        """The queued, running or succeeded job submitted with dedupe_key, or None."""
+        raw = self.redis_client.get(self._dedupe_key(dedupe_key))
+        record = self.get(raw.decode('ascii')) if raw else None
+        if record is None or record['status'] in (FAILED, CANCELLED):
+            return None
+        return record
+
+    def cancel(self, job_id):
+        """Request cancellation. Returns the updated record, or None if the job is unknown."""
+        record = self.get(job_id)
+        if record is None or record['status'] in FINISHED:
+            return record
+        # Set before the status changes, so a worker claiming the job concurrently sees it
+        self.redis_client.set(self._cancel_key(job_id), b"1", ex=self.ttl)
+        # A queued job is cancelled at once (workers skip it); a running one stops at its next progress report
+        self._transition(job_id, QUEUED, status=CANCELLED, finished_at=time.time())
+        return self.get(job_id)
+
+    def stats(self):
+        by_type = {}
+        for job_type in sorted(set(self.limits) | set(self._queued_types())):
+            limit = self._limit(job_type)
+            busy = sum(1 for slot in range(limit) if self.redis_client.exists(self._slot_key(job_type, slot)))
+            by_type[job_type] = {'limit': limit, QUEUED: self.redis_client.llen(self._queue_key(job_type)),
+                                 RUNNING: busy}
+        return {'limits': dict(self.limits), 'default_limit': self.default_limit, 'active': by_type}
+
+    def run_worker(self, renderers, job_types=None, threads=None, stop=None, poll_timeout=1.0):
+        """Run jobs until stop (a threading.Event) is set; used by job_worker.py.
+
+        renderers maps job type -> render(params), whose JSON-serializable
+        return value becomes the job result. Runs `threads` jobs at a time
+        (default: the sum of the types' limits), never more per type than the
+        deployment-wide limit allows.
+        """
+        job_types = list(job_types or renderers)
+        stop = stop or threading.Event()
+        threads = threads or sum(self._limit(job_type) for job_type in job_types)
+        workers = [threading.Thread(target=self._work, args=(renderers, job_types, stop, poll_timeout),
+                                    name=f"job-worker-{i}") for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def run_next(self, renderers, job_types=None, poll_timeout=1.0):
+        """Take and run one queued job if a slot is free. Returns its id, or None if nothing ran."""
+        for job_type in job_types or renderers:
+            slot = self._lease_slot(job_type)
+            if slot is None:
+                continue
+            try:
+                raw = self.redis_client.rpop(self._queue_key(job_type)) if poll_timeout <= 0 else \
+                    self._pop(job_type, poll_timeout)
+                if raw is not None:
+                    spec = json.loads(raw.decode('utf-8'))
+                    self._run(spec['job_id'], renderers[job_type], spec['params'], slot)
+                    return spec['job_id']
+            finally:
+                self.redis_client.delete(slot)
+        return None
+
+    # --- internals ---
+
+    def _create(self, job_type, **fields):
+        job_id = uuid.uuid4().hex
+        record = {
+            'job_id': job_id,
+            'type': job_type,
+            'status': QUEUED,
+            'progress': 0,
+            'message': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'heartbeat_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        record.update(fields)
+        pipe = self.redis_client.pipeline()
+        pipe.hset(self._key(job_id), mapping=self._encode(record))
+        pipe.expire(self._key(job_id), self.ttl)
+        pipe.execute()
+        return job_id
+
+    def _work(self, renderers, job_types, stop, poll_timeout):
+        while not stop.is_set():
+            try:
+                if self.run_next(renderers, job_types, poll_timeout) is None:
+                    stop.wait(poll_timeout / 4)  # every slot busy, or an idle poll
+            except Exception as e:
+                print(f"Job worker error: {e}")
+                stop.wait(poll_timeout)
+
+    def _pop(self, job_type, timeout):
+        popped = self.redis_client.brpop([self._queue_key(job_type)], timeout=max(1, int(timeout)))
+        return popped[1] if popped else None
+
+    def _lease_slot(self, job_type):
+        """Key of a free slot of job_type, now held by this worker, or None when all are busy."""
+        for slot in range(self._limit(job_type)):
+            key = self._slot_key(job_type, slot)
+            if self.redis_client.set(key, b"1", nx=True, px=int(self.stale_after * 1000)):
+                return key
+        return None
+
+    def _run(self, job_id, render, params, slot):
+        now = time.time()
+        if not self._transition(job_id, QUEUED, unless_cancelled=True, status=RUNNING, started_at=now,
+                                heartbeat_at=now):
+            return  # cancelled while queued, or expired
+        job = _RunningJob(self, job_id)
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, slot, done), daemon=True)
+        heartbeat.start()
+        _current.job = job
+        try:
+            result = render(params)
+            self._update(job_id, status=SUCCEEDED, progress=100, result=result, finished_at=time.time())
+        except JobCancelled:
+            self._update(job_id, status=CANCELLED, finished_at=time.time())
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            _current.job = None
+            done.set()
+            heartbeat.join()
+
+    def _heartbeat(self, job_id, slot, done):
+        while not done.wait(self.heartbeat_interval):
+            try:
+                self._update(job_id, heartbeat_at=time.time())
+                self.redis_client.pexpire(slot, int(self.stale_after * 1000))
+            except Exception as e:
+                print(f"Warning: could not refresh heartbeat of job {job_id}: {e}")
+
+    def _reap(self, record):
+        """Mark a running job failed if its worker stopped sending heartbeats."""
+        if record is None or record['status'] != RUNNING:
+            return record
+        last_seen = record.get('heartbeat_at') or record.get('started_at') or record['created_at']
+        if time.time() - last_seen <= self.stale_after:
+            return record
+        # Only if no heartbeat or final status arrived since record was read
+        self._transition(record['job_id'], RUNNING, expect={'heartbeat_at': record.get('heartbeat_at')},
+                         status=FAILED, finished_at=time.time(),
+                         error="The worker running this job stopped (restarted or killed)")
+        return self._load(record['job_id'])
+
+    def _progress(self, job, percent, message):
+        now = time.time()
+        if not job.cancelled.is_set() and now - job.last_cancel_check >= 1.0:
+            # Cancellation is requested through a web process
+            job.last_cancel_check = now
+            if self.redis_client.exists(self._cancel_key(job.job_id)):
+                job.cancelled.set()
+        if job.cancelled.is_set():
+            raise JobCancelled()
+        fields = {'progress': max(0, min(100, int(percent)))}
+        if message is not None:
+            fields['message'] = message
+        self._update(job.job_id, **fields)
+
+    def _update(self, job_id, **fields):
+        """Set fields of an existing record; each is written on its own, so concurrent writers don't clobber each other."""
+        key = self._key(job_id)
+        pipe = self.redis_client.pipeline()
+        pipe.exists(key)
+        pipe.hset(key, mapping=self._encode(fields))
+        exists, _ = pipe.execute()
+        if not exists:
+            self.redis_client.delete(key)  # expired meanwhile; don't leave a partial record behind
+
+    def _transition(self, job_id, from_status, unless_cancelled=False, expect=None, **fields):
+        """Set fields only if the job is still in from_status (and matches expect, and isn't cancelled
+        with unless_cancelled), as one WATCH/MULTI transaction. Returns whether it was applied."""
+        key = self._key(job_id)
+        watched = [key, self._cancel_key(job_id)] if unless_cancelled else [key]
+        with self.redis_client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*watched)
+                    current = self._decode(pipe.hgetall(key))
+                    if current.get('status') != from_status or \
+                            any(current.get(name) != value for name, value in (expect or {}).items()) or \
+                            (unless_cancelled and pipe.exists(self._cancel_key(job_id))):
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.hset(key, mapping=self._encode(fields))
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue  # written concurrently; check again
+
+    def _limit(self, job_type):
+        return self.limits.get(job_type, self.default_limit)
+
+    def _queued_types(self):
+        prefix = self._queue_key("")
+        return [key.decode('utf-8')[len(prefix):] for key in self.redis_client.scan_iter(match=prefix + "*")]
+
+    def _key(self, job_id):
+        return f"job:{job_id}"
+
+    def _queue_key(self, job_type):
+        return f"job:queue:{job_type}"
+
+    def _slot_key(self, job_type, slot):
+        return f"job:slot:{job_type}:{slot}"
+
+    def _cancel_key(self, job_id):
+        return f"job:{job_id}:cancel"
+
+    def _dedupe_key(self, dedupe_key):
+        return f"job:dedupe:{dedupe_key}"
+
+    def _encode(self, fields):
+        return {name: json.dumps(value).encode('utf-8') for name, value in fields.items()}
+
+    def _decode(self, raw_fields):
+        return {name.decode('utf-8'): json.loads(value.decode('utf-8')) for name, value in raw_fields.items()}
+
+    def _load(self, job_id):
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(self._key(job_id))
+        pipe.exists(self._cancel_key(job_id))
+        raw_fields, cancel_requested = pipe.execute()
+        if not raw_fields:
+            return None
+        record = self._decode(raw_fields)
+        record['cancel_requested'] = bool(cancel_requested)
+        return record
@@ -0,0 +1,59 @@
+import time
+import importlib
+import threading
+
+_UNSET = object()
+
+
+class LazyObject:
+    """Stands in for an expensive object (a heavy module, a model) until it is first used.
+
+    The loader runs once, on the first attribute access or call, under a lock
+    so concurrent first uses share a single load. After that the proxy just
+    forwards to the loaded object.
+    """
+
+    def __init__(self, loader, name=None):
+        self._loader = loader
+        self._name = name or getattr(loader, '__name__', 'lazy')
+        self._target = _UNSET
+        self._lock = threading.Lock()
+        self._load_seconds = None
+
+    def __getattr__(self, attr):
+        # Only called for attributes the proxy itself doesn't have
+        return getattr(self._resolve(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not _UNSET else "not loaded"
+        return f"<LazyObject {self._name} ({state})>"
+
+    def _resolve(self):
+        if self._target is _UNSET:
+            with self._lock:
+                if self._target is _UNSET:
+                    started = time.perf_counter()
+                    self._target = self._loader()
+                    self._load_seconds = time.perf_counter() - started
+        return self._target
+
+
+def lazy_import(module_name, attr=None):
+    """Lazy stand-in for `import module_name` or `from module_name import attr`."""
+    def load():
+        module = importlib.import_module(module_name)
+        return getattr(module, attr) if attr else module
+    return LazyObject(load, name=f"{module_name}.{attr}" if attr else module_name)
+
+
+def resolve(obj):
+    """The object behind a LazyObject, loading it if needed; other objects are returned as is."""
+    return obj._resolve() if isinstance(obj, LazyObject) else obj
+
+
+def load_seconds(obj):
+    """Seconds the LazyObject took to load, or None if it hasn't been loaded."""
+    return obj._load_seconds if isinstance(obj, LazyObject) else None
@@ -0,0 +1,240 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds a cached response of each prompt type stays valid; 0 disables caching for that type
+DEFAULT_TTLS = {
+    'default': 24 * 3600,
+    'rag': 24 * 3600,
+    'summary': 7 * 24 * 3600,
+    'slide_content': 7 * 24 * 3600,
+    'podcast_script': 7 * 24 * 3600,
+    'ppt_title': 30 * 24 * 3600,
+    'comic_dialogue': 7 * 24 * 3600,
+    'mcq': 24 * 3600,
+}
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.text = None
+        self.error = None
+
+
+class LLMGateway:
+    """Single entry point for text generation, with a content-addressed response cache.
+
+    Responses are keyed on (model name, prompt, generation config) and kept
+    in a local LRU in front of Redis, with a TTL per prompt type. Concurrent
+    identical requests share one model call: in-process through an in-flight
+    table, across processes through a short Redis lock that waiters poll.
+
+    Non-streaming calls go to `client` when one is given (an AsyncLLMRunner
+    with rate limiting and retries), otherwise straight to the model.
+    """
+
+    def __init__(self, model, redis_client=None, ttls=None, max_local_entries=512,
+                 lock_timeout=120, poll_interval=0.2, client=None, model_name=None):
+        self.model = model
+        self.client = client
+        # Pass model_name when model is a lazy proxy, so building the gateway doesn't load it
+        self.model_name = model_name or getattr(model, 'model_name', type(model).__name__)
+        self.redis_client = redis_client
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_local_entries = max_local_entries
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._local = OrderedDict()  # key -> (expires_at, text)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'redis_hits': 0, 'shared': 0, 'misses': 0, 'bypassed': 0}
+
+    # --- public API ---
+
+    def generate(self, prompt, prompt_type='default', generation_config=None, bypass_cache=False):
+        """Return the response text for prompt, from cache when possible."""
+        ttl = self._ttl(prompt_type)
+        if bypass_cache or ttl <= 0:
+            self._count('bypassed')
+            text = self._call(prompt, generation_config)
+            if ttl > 0:
+                self._store(self.cache_key(prompt, generation_config), text, ttl)
+            return text
+
+        key = self.cache_key(prompt, generation_config)
+        text = self._lookup(key)
+        if text is not None:
+            return text
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+        if not leader:
+            flight.done.wait()
+            self._count('shared')
+            if flight.error is not None:
+                raise flight.error
+            return flight.text
+
+        try:
+            flight.text = self._generate_once(key, prompt, generation_config, ttl)
+            return flight.text
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+    def generate_many(self, prompts, prompt_type='default', generation_config=None, max_workers=8):
+        """generate() for several prompts at once, at most max_workers in flight. Keeps prompt order."""
+        if len(prompts) <= 1 or max_workers <= 1:
+            return [self.generate(p, prompt_type, generation_config) for p in prompts]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as pool:
+            return list(pool.map(lambda p: self.generate(p, prompt_type, generation_config), prompts))
+
+    def stream(self, prompt, prompt_type='default', generation_config=None, bypass_cache=False):
+        """Yield response text pieces; a cached response arrives as one piece."""
+        ttl = self._ttl(prompt_type)
+        key = self.cache_key(prompt, generation_config)
+        if not bypass_cache and ttl > 0:
+            text = self._lookup(key)
+            if text is not None:
+                yield text
+                return
+            self._count('misses')
+        else:
+            self._count('bypassed')
+
+        kwargs = {'generation_config': generation_config} if generation_config is not None else {}
+        parts = []
+        for chunk in self.model.generate_content(prompt, stream=True, **kwargs):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+        if ttl > 0:
+            self._store(key, "".join(parts), ttl)
+
+    def cache_key(self, prompt, generation_config=None):
+        payload = json.dumps({
+            'model': self.model_name,
+            'prompt': prompt,
+            'config': self._config_dict(generation_config)
+        }, sort_keys=True, default=str)
+        return "llm:v1:" + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+        lookups = stats['local_hits'] + stats['redis_hits'] + stats['shared'] + stats['misses']
+        stats['hit_rate'] = (lookups - stats['misses']) / lookups if lookups else 0.0
+        return stats
+
+    # --- internals ---
+
+    def _generate_once(self, key, prompt, generation_config, ttl):
+        """Call the model unless another process already is; then cache the result."""
+        lock_key = key + ":lock"
+        have_lock = True
+        if self.redis_client is not None:
+            try:
+                have_lock = bool(self.redis_client.set(lock_key, b"1", nx=True, ex=self.lock_timeout))
+            except Exception as e:
+                print(f"Warning: LLM cache lock unavailable: {e}")
+        if not have_lock:
+            deadline = time.time() + self.lock_timeout
+            while time.time() < deadline:
+                time.sleep(self.poll_interval)
+                text = self._lookup(key)
+                if text is not None:
+                    return text
+                try:
+                    if not self.redis_client.exists(lock_key):
+                        break  # the other process failed; generate here
+                except Exception:
+                    break
+
+        self._count('misses')
+        try:
+            text = self._call(prompt, generation_config)
+            self._store(key, text, ttl)
+            return text
+        finally:
+            if have_lock and self.redis_client is not None:
+                try:
+                    self.redis_client.delete(lock_key)
+                except Exception:
+                    pass
+
+    def _call(self, prompt, generation_config):
+        if self.client is not None:
+            return self.client.generate(prompt, generation_config)
+        if generation_config is not None:
+            return self.model.generate_content(prompt, generation_config=generation_config).text
+        return self.model.generate_content(prompt).text
+
+    def _lookup(self, key):
+        now = time.time()
+        with self._lock:
+            cached = self._local.get(key)
+            if cached is not None:
+                expires_at, text = cached
+                if expires_at > now:
+                    self._local.move_to_end(key)
+                    self._stats['local_hits'] += 1
+                    return text
+                del self._local[key]
+
+        if self.redis_client is None:
+            return None
+        try:
+            raw = self.redis_client.get(key)
+            remaining = self.redis_client.ttl(key) if raw is not None else None
+        except Exception as e:
+            print(f"Warning: could not read LLM cache from Redis: {e}")
+            return None
+        if raw is None:
+            return None
+        text = raw.decode('utf-8')
+        self._remember(key, text, remaining if remaining and remaining > 0 else self.ttls['default'])
+        self._count('redis_hits')
+        return text
+
+    def _store(self, key, text, ttl):
+        self._remember(key, text, ttl)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(key, text.encode('utf-8'), ex=ttl)
+            except Exception as e:
+                print(f"Warning: could not store LLM response in Redis: {e}")
+
+    def _remember(self, key, text, ttl):
+        with self._lock:
+            self._local[key] = (time.time() + ttl, text)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def _ttl(self, prompt_type):
+        return self.ttls.get(prompt_type, self.ttls['default'])
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _config_dict(generation_config):
+        if generation_config is None:
+            return None
+        if isinstance(generation_config, dict):
+            return generation_config
+        # genai.GenerationConfig and similar objects
+        return {k: v for k, v in vars(generation_config).items() if v is not None}
@@ -0,0 +1,56 @@
+"""Report RSS, PSS and USS of a gunicorn master and its workers (Linux only).
+
+PSS splits shared pages evenly between the processes mapping them, so the sum
+of PSS is the real footprint of the whole server; USS is what a single worker
+costs on top of the shared, copy-on-write model weights.
+
+    gunicorn -c gunicorn.conf.py wsgi:app &
+    python measure_worker_memory.py <master pid>
+"""
+import sys
+import argparse
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory(pid):
+    """RSS, PSS and USS of pid in KiB, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return fields.get('Rss', 0), fields.get('Pss', 0), uss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pid", type=int, help="pid of the gunicorn master")
+    args = parser.parse_args()
+
+    pids = [('master', args.pid)] + [('worker', child) for child in children(args.pid)]
+    totals = [0, 0, 0]
+    print(f"{'role':8} {'pid':>8} {'RSS MiB':>10} {'PSS MiB':>10} {'USS MiB':>10}")
+    for role, pid in pids:
+        try:
+            values = memory(pid)
+        except OSError as e:
+            print(f"{role:8} {pid:>8} unreadable: {e}")
+            continue
+        totals = [t + v for t, v in zip(totals, values)]
+        print(f"{role:8} {pid:>8} " + " ".join(f"{v / 1024:>10.1f}" for v in values))
+    print(f"{'total':8} {'':>8} " + " ".join(f"{v / 1024:>10.1f}" for v in totals))
+    print("PSS total is the server's real footprint; RSS total double-counts shared pages.")
+    return 0 if len(pids) > 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Local stand-in for the Gemini generateContent REST endpoint.
+
+Run from backend/:
+    python mock_llm_server.py [--port 8089] [--latency 0.5] [--failure-rate 0.05] [--rpm 120]
+
+then point the app at it with LLM_CLIENT=async LLM_BASE_URL=http://127.0.0.1:8089/v1beta.
+Replies are deterministic per prompt. Each API key gets --rpm requests per
+minute before it is answered with 429 + Retry-After, and --failure-rate of
+requests fail with 503, so retries and rate limiting can be exercised offline.
+"""
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import defaultdict, deque
+
+from aiohttp import web
+
+
+def create_app(latency=0.5, jitter=0.2, failure_rate=0.0, rpm=0, seed=None):
+    rng = random.Random(seed)
+    recent = defaultdict(deque)  # api key -> request timestamps in the last minute
+    counters = {'requests': 0, 'rate_limited': 0, 'failed': 0}
+
+    async def generate_content(request):
+        counters['requests'] += 1
+        key = request.query.get('key', '')
+        now = time.monotonic()
+        if rpm:
+            window = recent[key]
+            while window and now - window[0] > 60:
+                window.popleft()
+            if len(window) >= rpm:
+                counters['rate_limited'] += 1
+                retry_after = max(0.1, 60 - (now - window[0]))
+                return web.json_response({'error': {'code': 429, 'message': 'Resource has been exhausted'}},
+                                         status=429, headers={'Retry-After': f"{retry_after:.1f}"})
+            window.append(now)
+
+        body = await request.json()
+        prompt = "".join(part.get('text', '') for content in body.get('contents', [])
+                         for part in content.get('parts', []))
+        await asyncio.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+        if rng.random() < failure_rate:
+            counters['failed'] += 1
+            return web.json_response({'error': {'code': 503, 'message': 'The model is overloaded'}}, status=503)
+
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        text = f"[mock {request.match_info['model']} {digest[:8]}] reply to {len(prompt)} characters of prompt"
+        return web.json_response({'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]})
+
+    async def stats(request):
+        return web.json_response(counters)
+
+    app = web.Application()
+    app.router.add_post('/v1beta/models/{model}:generateContent', generate_content)
+    app.router.add_get('/stats', stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="mean seconds per reply")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of replies that are 503s")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute per key before 429s (0 = unlimited)")
+    args = parser.parse_args()
+    web.run_app(create_app(args.latency, args.jitter, args.failure_rate, args.rpm), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class StageError(Exception):
+    def __init__(self, stage, error):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Pipeline:
+    """Small DAG executor: each stage declares the names of its inputs.
+
+    A stage starts as soon as all of its inputs exist, so independent stages
+    run concurrently and the wall time tracks the critical path. Inputs are
+    passed to the stage function as keyword arguments; its return value
+    becomes the input of the same name for later stages.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.stages = {}  # name -> (func, inputs)
+
+    def add(self, name, func, inputs=()):
+        self.stages[name] = (func, tuple(inputs))
+        return self
+
+    def run(self, values, targets=None):
+        """Run the stages needed for targets (default: all).
+
+        Returns (results, timings); timings maps each stage to its start
+        offset and duration in milliseconds, plus the overall total_ms.
+        Raises StageError for the first stage that fails, without waiting
+        for the stages still running.
+        """
+        needed = self._needed(targets or list(self.stages), values)
+        results = dict(values)
+        timings = {}
+        pending = dict(needed)
+        running = {}
+        start = time.perf_counter()
+
+        def timed(name, func, kwargs):
+            began = time.perf_counter()
+            try:
+                return func(**kwargs)
+            finally:
+                timings[name] = {
+                    'start_ms': round((began - start) * 1000, 1),
+                    'duration_ms': round((time.perf_counter() - began) * 1000, 1)
+                }
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                for name in [n for n, (_, inputs) in pending.items() if all(i in results for i in inputs)]:
+                    func, inputs = pending.pop(name)
+                    running[pool.submit(timed, name, func, {i: results[i] for i in inputs})] = name
+                if not running:
+                    raise ValueError(f"Stages can never run: {sorted(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        raise StageError(name, e) from e
+        except BaseException:
+            # Fail now: stages already running finish in the background and their results are dropped
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+        timings['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return results, timings
+
+    def _needed(self, targets, values):
+        needed = {}
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name in values:
+                continue
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage or missing input: {name}")
+            needed[name] = self.stages[name]
+            stack.extend(self.stages[name][1])
+        return needed
@@ -0,0 +1,127 @@
+import json
+import hashlib
+import threading
+
+
+def normalize_text(text):
+    """Canonical form of user text for fingerprinting: unified newlines, no trailing spaces or edge blank lines."""
+    lines = (text or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def fingerprint(kind, **inputs):
+    """Stable id of a render request: the output kind plus its normalized inputs."""
+    payload = json.dumps({'kind': kind, 'inputs': inputs}, sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.artifact_id = None
+
+
+class RenderCache:
+    """Maps render fingerprints to artifacts so identical requests are rendered once.
+
+    Completed renders are remembered in Redis (fingerprint -> artifact id) for
+    ttl seconds and served from the ArtifactStore. Identical renders running
+    at the same time in this process are joined: followers wait for the
+    leader and reuse its artifact.
+    """
+
+    def __init__(self, artifact_store, redis_client=None, ttl=7 * 24 * 3600):
+        self.artifact_store = artifact_store
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._local = {}  # used when Redis is unavailable
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'joined': 0, 'bytes_saved': 0}
+
+    # --- public API ---
+
+    def lookup(self, fp):
+        """Artifact metadata for a finished render of fp, or None. Counts a hit (and the bytes saved)."""
+        meta = self._artifact_for(fp)
+        if meta is not None:
+            self._count('hits', meta['size'])
+        return meta
+
+    def remember(self, fp, meta):
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(self._key(fp), meta['artifact_id'].encode('ascii'), ex=self.ttl)
+                return
+            except Exception as e:
+                print(f"Warning: could not store render fingerprint in Redis: {e}")
+        self._local[fp] = meta['artifact_id']
+
+    def run(self, fp, render):
+        """Return (meta, how) for fp, with how one of "hit", "joined" or "rendered".
+
+        render() must produce the artifact and return its metadata, or None if
+        it failed; a failed leader lets each waiting follower render itself.
+        """
+        meta = self.lookup(fp)
+        if meta is not None:
+            return meta, "hit"
+
+        with self._lock:
+            flight = self._in_flight.get(fp)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[fp] = _InFlight()
+        if not leader:
+            flight.done.wait()
+            meta = self.artifact_store.get(flight.artifact_id) if flight.artifact_id else None
+            if meta is not None:
+                self._count('joined', meta['size'])
+                return meta, "joined"
+            return self._render(fp, render), "rendered"
+
+        try:
+            meta = self._render(fp, render)
+            flight.artifact_id = meta['artifact_id'] if meta else None
+            return meta, "rendered"
+        finally:
+            with self._lock:
+                self._in_flight.pop(fp, None)
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        requests = stats['hits'] + stats['joined'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['joined']) / requests if requests else 0.0
+        return stats
+
+    # --- internals ---
+
+    def _render(self, fp, render):
+        self._count('misses')
+        meta = render()
+        if meta is not None:
+            self.remember(fp, meta)
+        return meta
+
+    def _artifact_for(self, fp):
+        artifact_id = None
+        if self.redis_client is not None:
+            try:
+                raw = self.redis_client.get(self._key(fp))
+                artifact_id = raw.decode('ascii') if raw else None
+            except Exception as e:
+                print(f"Warning: could not read render fingerprint from Redis: {e}")
+        artifact_id = artifact_id or self._local.get(fp)
+        # The artifact may have been pruned from the store since
+        return self.artifact_store.get(artifact_id) if artifact_id else None
+
+    def _count(self, name, size=0):
+        with self._lock:
+            self._stats[name] += 1
+            if name in ('hits', 'joined'):
+                self._stats['bytes_saved'] += size
+
+    def _key(self, fp):
+        return f"render:v1:{fp}"
@@ -0,0 +1,123 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+def normalize_segment_text(text):
+    """Whitespace-insensitive form of a spoken line; anything else changes the audio."""
+    return " ".join((text or "").split())
+
+
+class SegmentCache:
+    """Rendered TTS segments (WAV files) on disk, keyed by what was said and how.
+
+    The key covers the normalized text, the engine's voice id, rate and
+    volume, so a regenerated script only needs its changed lines
+    synthesized. Files live at ab/<key>.wav under root. Reading a segment
+    marks it as recently used; once the cache grows past max_bytes the least
+    recently used segments are removed until it is back under 90% of it.
+    """
+
+    def __init__(self, root, max_bytes=1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # bytes on disk, counted on first use
+        self._stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        os.makedirs(root, exist_ok=True)
+
+    # --- public API ---
+
+    @staticmethod
+    def key(text, voice, rate, volume):
+        payload = json.dumps([normalize_segment_text(text), voice, rate, round(float(volume), 3)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Path of the cached segment for key, or None."""
+        path = self._path(key)
+        try:
+            os.utime(path)  # recently used
+        except OSError:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return path
+
+    def put(self, key, source_path):
+        """Store a copy of the WAV file at source_path under key and return the cached path."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        os.close(fd)
+        shutil.copyfile(source_path, temp_path)
+        size = os.path.getsize(temp_path)
+        try:
+            size -= os.path.getsize(path)  # replacing a segment stored concurrently
+        except OSError:
+            pass
+        os.replace(temp_path, path)  # atomic, so readers never see a partial segment
+        with self._lock:
+            self._stats['stored'] += 1
+            if self._total is not None:
+                self._total += size
+        if self.max_bytes and self.total_bytes() > self.max_bytes:
+            self._prune()
+        return path
+
+    def total_bytes(self):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, _, size in self._segments())
+            return self._total
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['bytes'] = self.total_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    # --- internals ---
+
+    def _prune(self):
+        with self._lock:
+            segments = sorted(self._segments(), key=lambda segment: segment[1])  # oldest use first
+            total = sum(size for _, _, size in segments)
+            target = self.max_bytes * 0.9
+            for path, _, size in segments:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self._stats['evicted'] += 1
+            self._total = total
+
+    def _segments(self):
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith('.wav'):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + '.wav')
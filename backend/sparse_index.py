@@ -0,0 +1,180 @@
+import io
+import re
+import json
+from collections import Counter
+
+import numpy as np
+
+# Keeps identifiers like "gpt-4", "v1.2" or "resnet_50" as single terms
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+class PostingsSegment:
+    """Immutable postings for one batch of chunks, stored as CSR arrays.
+
+    Row r of the CSR holds the (chunk id, term frequency) pairs of term
+    terms[r]; chunk ids are local to the segment.
+    """
+
+    def __init__(self, terms, offsets, doc_ids, tfs, doc_lengths):
+        self.terms = terms  # term -> row
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.total_length = int(doc_lengths.sum())
+
+    @classmethod
+    def build(cls, texts):
+        postings = {}
+        doc_lengths = np.zeros(len(texts), dtype="int32")
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        terms = {}
+        offsets = np.zeros(len(postings) + 1, dtype="int64")
+        size = sum(len(p) for p in postings.values())
+        doc_ids = np.empty(size, dtype="int32")
+        tfs = np.empty(size, dtype="uint16")
+        position = 0
+        for row, (term, pairs) in enumerate(postings.items()):
+            terms[term] = row
+            for doc_id, tf in pairs:
+                doc_ids[position] = doc_id
+                tfs[position] = min(tf, 65535)
+                position += 1
+            offsets[row + 1] = position
+        return cls(terms, offsets, doc_ids, tfs, doc_lengths)
+
+    @property
+    def num_docs(self):
+        return len(self.doc_lengths)
+
+    def postings(self, term):
+        row = self.terms.get(term)
+        if row is None:
+            return None
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        vocabulary = sorted(self.terms, key=self.terms.get)
+        np.savez(buffer, offsets=self.offsets, doc_ids=self.doc_ids, tfs=self.tfs,
+                 doc_lengths=self.doc_lengths,
+                 vocabulary=np.frombuffer(json.dumps(vocabulary).encode("utf-8"), dtype="uint8"))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, raw):
+        data = np.load(io.BytesIO(raw))
+        vocabulary = json.loads(data["vocabulary"].tobytes().decode("utf-8"))
+        return cls({term: row for row, term in enumerate(vocabulary)},
+                   data["offsets"], data["doc_ids"], data["tfs"], data["doc_lengths"])
+
+
+class BM25Index:
+    """Okapi BM25 over an ordered list of postings segments.
+
+    Global chunk ids run through the segments in order (segment 0 first),
+    the same numbering faiss.IndexShards uses with successive ids, so
+    adding a document is just appending its segment.
+    """
+
+    def __init__(self, segments=None, k1=1.5, b=0.75):
+        self.segments = list(segments or [])
+        self.k1 = k1
+        self.b = b
+
+    @classmethod
+    def from_texts(cls, texts, **kwargs):
+        return cls([PostingsSegment.build(texts)], **kwargs)
+
+    @property
+    def num_docs(self):
+        return sum(segment.num_docs for segment in self.segments)
+
+    def add_texts(self, texts):
+        segment = PostingsSegment.build(texts)
+        self.segments.append(segment)
+        return segment
+
+    def add_segment(self, segment):
+        self.segments.append(segment)
+
+    def remove_segment(self, segment):
+        self.segments = [s for s in self.segments if s is not segment]
+
+    def search(self, query, top_k=10):
+        """Return (scores, ids) of the best-matching chunks, highest score first."""
+        num_docs = self.num_docs
+        terms = set(tokenize(query))
+        if not num_docs or not terms:
+            return np.zeros(0, dtype="float32"), np.zeros(0, dtype="int64")
+
+        avg_length = max(sum(s.total_length for s in self.segments) / num_docs, 1e-9)
+        scores = np.zeros(num_docs, dtype="float32")
+        for term in terms:
+            hits = []
+            base = 0
+            for segment in self.segments:
+                found = segment.postings(term)
+                if found is not None:
+                    hits.append((base, segment, found))
+                base += segment.num_docs
+            df = sum(len(found[0]) for _, _, found in hits)
+            if not df:
+                continue
+            idf = np.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            for base, segment, (doc_ids, tfs) in hits:
+                tf = tfs.astype("float32")
+                norm = self.k1 * (1 - self.b + self.b * segment.doc_lengths[doc_ids] / avg_length)
+                scores[base + doc_ids] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return scores[order], order
+
+
+def reciprocal_rank_fusion(rankings, weights=None, k=60):
+    """Fuse ranked id lists: score(id) = sum_i weight_i / (k + rank_i(id)). Returns ids, best first."""
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        if weight <= 0:
+            continue
+        for rank, doc_id in enumerate(ranking):
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + weight / (k + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)
+
+
+def weighted_score_fusion(scored_rankings, weights=None):
+    """Fuse (scores, ids) pairs by weighted sum of min-max normalized scores. Returns ids, best first."""
+    weights = weights or [1.0] * len(scored_rankings)
+    fused = {}
+    for (scores, ids), weight in zip(scored_rankings, weights):
+        if weight <= 0 or len(scores) == 0:
+            continue
+        low, high = float(np.min(scores)), float(np.max(scores))
+        for score, doc_id in zip(scores, ids):
+            normalized = (float(score) - low) / (high - low) if high > low else 1.0
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + weight * normalized
+    return sorted(fused, key=fused.get, reverse=True)
+
+
+def fuse_rankings(dense, sparse, dense_weight=1.0, sparse_weight=1.0, method="rrf"):
+    """Combine dense and sparse (scores, ids) results with "rrf" or "weighted" fusion."""
+    if method == "rrf":
+        return reciprocal_rank_fusion([dense[1], sparse[1]], [dense_weight, sparse_weight])
+    if method == "weighted":
+        return weighted_score_fusion([dense, sparse], [dense_weight, sparse_weight])
+    raise ValueError(f"Unknown fusion method: {method}")
@@ -0,0 +1,148 @@
+import re
+
+from chunker import is_heading
+
+# Unnumbered headings common in papers ("Abstract", "Related Work", ...)
+_KNOWN_SECTION = re.compile(
+    r'^(abstract|introduction|background|related work|preliminaries|method(s|ology)?|approach|'
+    r'experiments?|experimental (setup|results)|evaluation|results( and discussion)?|discussion|'
+    r'limitations|future work|conclusions?( and future work)?|acknowledge?ments|references|'
+    r'bibliography|appendix( [a-z])?)\s*:?$',
+    re.IGNORECASE
+)
+# Sections that are not worth summarizing
+_SKIPPED_SECTION = re.compile(r'^(\d+(\.\d+)*\.?\s+)?(references|bibliography|acknowledge?ments)$', re.IGNORECASE)
+
+SECTION_PROMPT = """Summarize the following section of a research paper.
+Guidelines: {level_prompt}
+Format the response exactly as:
+## {title}
+- Bullet point 1
+- Bullet point 2
+
+Section "{title}":
+{body}
+"""
+
+REDUCE_PROMPT = """Below are summaries of consecutive parts of one research paper, in order.
+Merge them into the paper's major sections: combine parts of the same section, drop repeated points,
+and keep each section's bullets faithful to its summary. Guidelines: {level_prompt}
+Format the response exactly as:
+## Section Name
+- Bullet point 1
+- Bullet point 2
+
+Section summaries:
+{summaries}
+"""
+
+
+def split_sections(text, max_chars=12000, min_chars=400):
+    """Split paper text into [(title, body)] on detected headings.
+
+    Reference lists are dropped, sections shorter than min_chars are merged
+    into the previous one (front matter into the first section) and longer than max_chars are split on paragraph
+    (or line) boundaries into numbered parts.
+    """
+    sections = []
+    title, lines = None, []  # text before the first heading
+    for line in text.splitlines():
+        stripped = line.strip()
+        if len(stripped) <= 100 and (is_heading(stripped) or _KNOWN_SECTION.match(stripped)):
+            sections.append((title, "\n".join(lines).strip()))
+            title, lines = stripped.lstrip("#").strip().rstrip(":"), []
+        else:
+            lines.append(line)
+    sections.append((title, "\n".join(lines).strip()))
+
+    merged = []
+    leading = ""  # short front matter (title, authors) is folded into the first real section
+    for title, body in sections:
+        if not body or (title and _SKIPPED_SECTION.match(title)):
+            continue
+        if len(body) >= min_chars:
+            merged.append((title or "Overview", f"{leading}\n\n{body}" if leading else body))
+            leading = ""
+        elif merged:
+            previous_title, previous_body = merged[-1]
+            merged[-1] = (previous_title, f"{previous_body}\n\n{title}\n{body}")
+        else:
+            leading = "\n\n".join(part for part in (leading, title, body) if part)
+    if leading:
+        merged.append(("Overview", leading))
+
+    result = []
+    for title, body in merged:
+        parts = _split_body(body, max_chars)
+        if len(parts) == 1:
+            result.append((title, body))
+        else:
+            result.extend((f"{title} (part {i})", part) for i, part in enumerate(parts, start=1))
+    return result
+
+
+def _split_body(body, max_chars):
+    if len(body) <= max_chars:
+        return [body]
+    blocks = re.split(r'\n\s*\n', body)
+    if len(blocks) == 1:
+        blocks = body.splitlines()
+    parts, current = [], ""
+    for block in blocks:
+        if len(block) > max_chars and current:
+            # Flush first, so the windows of an oversized block stay after the text before it
+            parts.append(current)
+            current = ""
+        while len(block) > max_chars:
+            parts.append(block[:max_chars])
+            block = block[max_chars:]
+        if current and len(current) + len(block) + 2 > max_chars:
+            parts.append(current)
+            current = ""
+        current = f"{current}\n\n{block}" if current else block
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _ensure_format(title, summary):
+    """Make a map output one "## title" block of "- " bullets."""
+    lines = [line.rstrip() for line in summary.strip().splitlines() if line.strip()]
+    if not lines or not lines[0].startswith("## "):
+        lines.insert(0, f"## {title}")
+    bullets = [lines[0]]
+    for line in lines[1:]:
+        stripped = line.strip()
+        if stripped.startswith("## "):
+            continue
+        if stripped.startswith(("* ", "• ")):
+            stripped = "- " + stripped[2:]
+        bullets.append(stripped if stripped.startswith("- ") else f"- {stripped}")
+    return "\n".join(bullets)
+
+
+def map_reduce_summarize(llm, text, level_prompt, max_section_chars=12000, max_workers=4):
+    """Summarize each detected section in parallel, then merge them with one reduce call.
+
+    Section prompts go through the LLM gateway cache, so editing one section
+    only re-summarizes that section. Output uses the same "## Section" /
+    "- bullet" format as the single-prompt summary.
+    """
+    sections = split_sections(text, max_chars=max_section_chars)
+    if not sections:
+        raise ValueError("No text to summarize")
+
+    prompts = [SECTION_PROMPT.format(level_prompt=level_prompt, title=title, body=body) for title, body in sections]
+    mapped = llm.generate_many(prompts, prompt_type='summary', max_workers=max_workers)
+    summaries = [_ensure_format(title, summary) for (title, _), summary in zip(sections, mapped)]
+    print(f"Map-reduce summary: {len(sections)} sections summarized")
+    if len(summaries) == 1:
+        return summaries[0]
+
+    combined = "\n\n".join(summaries)
+    reduced = llm.generate(REDUCE_PROMPT.format(level_prompt=level_prompt, summaries=combined),
+                           prompt_type='summary')
+    # Fall back to the per-section summaries if the reduce pass lost the format
+    if not re.search(r'^## \S', reduced, re.MULTILINE):
+        return combined
+    return reduced
@@ -0,0 +1,44 @@
+"""Offline test setup: fake LLM and TTS backends and an in-process fake Redis.
+
+Run from backend/:
+    pip install -r requirements-dev.txt
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_STATE_DIR = tempfile.mkdtemp(prefix="reconvai_tests_")
+for _name, _value in {
+    'LLM_BACKEND': 'fake',
+    'TTS_BACKEND': 'fake',
+    'TTS_POOL_SIZE': '1',
+    'TTS_CACHE_DIR': os.path.join(_STATE_DIR, 'tts_cache'),
+    'DOC_STORE_DIR': os.path.join(_STATE_DIR, 'doc_store'),
+    'ARTIFACT_DIR': os.path.join(_STATE_DIR, 'artifacts'),
+}.items():
+    os.environ.setdefault(_name, _value)
+
+
+@pytest.fixture(scope="session")
+def ex_module():
+    """ex imported with every Redis client it creates backed by fakeredis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis
+    redis.Redis = fakeredis.FakeRedis
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)  # templates/ and onnx_model/ are relative to backend/
+    import ex
+    yield ex
+    ex.tts_pool.close()
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope="session")
+def client(ex_module):
+    return ex_module.create_app().test_client()
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from answer_cache import AnswerCache
+
+DOCUMENT = "d" * 64
+
+
+def unit(*values):
+    vector = np.zeros(8, dtype='float32')
+    vector[:len(values)] = values
+    return vector
+
+
+@pytest.fixture
+def shared_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis()
+
+
+def test_exact_and_reworded_questions_hit(shared_redis):
+    cache = AnswerCache(shared_redis)
+    cache.store(DOCUMENT, [3, 1, 2], "What is the recall?", unit(1, 0), "Within one point.")
+
+    assert cache.lookup(DOCUMENT, [1, 2, 3], "what is  the recall?", unit(1, 0)) == ("Within one point.", 'exact')
+    # Reworded, with one of the three chunks different
+    assert cache.lookup(DOCUMENT, [1, 2, 4], "How good is recall?", unit(0.99, 0.1)) == \
+        ("Within one point.", 'semantic')
+    # Similar wording but mostly different context
+    assert cache.lookup(DOCUMENT, [7, 8, 4], "How good is recall?", unit(0.99, 0.1)) == (None, None)
+    assert cache.lookup(DOCUMENT, [1, 2, 3], "Who wrote it?", unit(0, 1)) == (None, None)
+
+
+def test_workers_sharing_redis_keep_each_others_answers(shared_redis):
+    first, second = AnswerCache(shared_redis, local_ttl=60), AnswerCache(shared_redis, local_ttl=60)
+    # Both workers have the (empty) group in their local tier before either stores
+    assert first.lookup(DOCUMENT, [1, 2], "Question one?", unit(1, 0)) == (None, None)
+    assert second.lookup(DOCUMENT, [1, 2], "Question two?", unit(0, 1)) == (None, None)
+
+    first.store(DOCUMENT, [1, 2], "Question one?", unit(1, 0), "Answer one.")
+    second.store(DOCUMENT, [1, 2], "Question two?", unit(0, 1), "Answer two.")
+
+    third = AnswerCache(shared_redis)
+    assert third.lookup(DOCUMENT, [1, 2], "Question one?", unit(1, 0)) == ("Answer one.", 'exact')
+    assert third.lookup(DOCUMENT, [1, 2], "Question two?", unit(0, 1)) == ("Answer two.", 'exact')
+    # Each writer re-reads its groups after storing, so it sees the other's answer too
+    assert first.lookup(DOCUMENT, [1, 2], "Question two?", unit(0, 1)) == ("Answer two.", 'exact')
+
+
+def test_local_tier_expires_quickly(shared_redis):
+    reader, writer = AnswerCache(shared_redis, local_ttl=0), AnswerCache(shared_redis)
+    assert reader.lookup(DOCUMENT, [5], "Question?", unit(1, 0)) == (None, None)
+    writer.store(DOCUMENT, [5], "Question?", unit(1, 0), "Answer.")
+    assert reader.lookup(DOCUMENT, [5], "Question?", unit(1, 0)) == ("Answer.", 'exact')
+
+
+def test_groups_keep_the_newest_entries(shared_redis):
+    cache = AnswerCache(shared_redis, max_entries_per_group=2)
+    for i in range(3):
+        cache.store(DOCUMENT, [9], f"Question {i}?", unit(1, i), f"Answer {i}.")
+    cache.store(DOCUMENT, [9], "Question 2?", unit(1, 2), "Newer answer 2.")
+
+    assert cache.lookup(DOCUMENT, [9], "Question 0?", unit(1, 0))[1] != 'exact'
+    assert cache.lookup(DOCUMENT, [9], "Question 2?", unit(1, 2)) == ("Newer answer 2.", 'exact')
+
+
+def test_without_redis_the_local_tier_is_used():
+    cache = AnswerCache(None)
+    cache.store(DOCUMENT, [1], "Question?", unit(1, 0), "Answer.")
+    assert cache.lookup(DOCUMENT, [1], "Question?", unit(1, 0)) == ("Answer.", 'exact')
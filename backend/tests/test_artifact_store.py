@@ -0,0 +1,45 @@
+import os
+import time
+
+from artifact_store import ArtifactStore
+
+
+def blob(n, size=100):
+    return bytes([n]) * size
+
+
+def scanned_sizes(store):
+    return sum(size for _, _, size in store._blobs())
+
+
+def test_puts_keep_a_running_total_without_scanning(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path), max_bytes=10_000)
+    store.put_bytes(blob(0))
+    scans = []
+    blobs = store._blobs
+    monkeypatch.setattr(store, '_blobs', lambda: scans.append(1) or blobs())
+
+    for n in range(1, 20):
+        store.put_bytes(blob(n))
+    store.put_bytes(blob(5))  # already stored
+    assert scans == []
+    assert store.total_bytes() == 2000
+
+    meta = store.put_bytes(blob(30))
+    store.delete(meta['artifact_id'])
+    assert store.total_bytes() == 2000 == scanned_sizes(store)
+
+
+def test_going_over_the_limit_prunes_least_recently_used(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=1000)
+    ids = []
+    for n in range(10):
+        ids.append(store.put_bytes(blob(n))['artifact_id'])
+        past = time.time() - 100 + n
+        os.utime(store._blob_path(ids[-1]), (past, past))
+    store.get(ids[0])  # recently used again
+
+    newest = store.put_bytes(blob(10))['artifact_id']
+    assert store.total_bytes() == scanned_sizes(store) <= 900
+    assert store.get(newest) is not None and store.get(ids[0]) is not None
+    assert store.get(ids[1]) is None and store.get(ids[2]) is None
@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from async_llm import AsyncLLMClient, LLMRequestError, LLMRateLimitError
+from mock_llm_server import create_app
+
+
+def run_against(app, scenario, **client_options):
+    """Serve app locally and run scenario(client) with an AsyncLLMClient pointed at it."""
+    async def main():
+        server = TestServer(app)
+        await server.start_server()
+        options = dict(base_delay=0.01, max_delay=0.05, requests_per_minute=6000)
+        options.update(client_options)
+        client = AsyncLLMClient(options.pop('api_keys', 'test-key'),
+                                base_url=str(server.make_url('/v1beta')), **options)
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_replies_keep_prompt_order():
+    async def scenario(client):
+        return await client.generate_many([f"prompt {i}" for i in range(8)])
+
+    replies = run_against(create_app(latency=0.01, jitter=0), scenario)
+    assert len(replies) == 8
+    assert all("reply to 8 characters" in reply for reply in replies)
+
+
+def test_transient_failures_are_retried():
+    async def scenario(client):
+        replies = await client.generate_many([f"prompt {i}" for i in range(20)])
+        return replies, client.stats
+
+    replies, stats = run_against(create_app(latency=0, jitter=0, failure_rate=0.3, seed=7), scenario,
+                                 max_retries=10)
+    assert len(replies) == 20
+    assert stats['retries'] > 0
+    assert stats['failures'] == 0
+
+
+def test_gives_up_after_max_retries():
+    async def scenario(client):
+        with pytest.raises(LLMRequestError) as raised:
+            await client.generate("always fails")
+        return raised.value, client.stats
+
+    error, stats = run_against(create_app(latency=0, jitter=0, failure_rate=1.0), scenario, max_retries=2)
+    assert error.status == 503
+    assert stats['retries'] == 2
+    assert stats['failures'] == 1
+
+
+def test_rate_limit_blocks_the_key():
+    async def scenario(client):
+        await client.generate("first")
+        with pytest.raises(LLMRateLimitError):
+            await client.generate("second")
+        return client.stats, client._buckets['test-key'].wait_time()
+
+    stats, wait = run_against(create_app(latency=0, jitter=0, rpm=1), scenario, max_retries=0)
+    assert stats['rate_limited'] == 1
+    # Retry-After (about a minute) is honoured by the key's bucket
+    assert wait > 30
+
+
+def test_keys_share_the_load():
+    async def scenario(client):
+        return await client.generate_many(["a", "b", "c", "d"]), client.stats
+
+    # Each key may send 2 requests a minute: 4 requests only fit when both keys are used
+    replies, stats = run_against(create_app(latency=0, jitter=0, rpm=2), scenario,
+                                 api_keys=["key-1", "key-2"], requests_per_minute=120, max_retries=0)
+    assert len(replies) == 4
+    assert stats['rate_limited'] == 0
+
+
+def test_backoff_does_not_hold_a_concurrency_slot():
+    failures = {'left': 2}
+
+    async def generate_content(request):
+        prompt = (await request.json())['contents'][0]['parts'][0]['text']
+        if prompt == "flaky" and failures['left']:
+            failures['left'] -= 1
+            return web.json_response({}, status=503, headers={'Retry-After': '0.5'})
+        return web.json_response({'candidates': [{'content': {'parts': [{'text': prompt}]}}]})
+
+    app = web.Application()
+    app.router.add_post('/v1beta/models/{model}:generateContent', generate_content)
+
+    async def scenario(client):
+        started = time.monotonic()
+        flaky = asyncio.ensure_future(client.generate("flaky"))
+        await asyncio.sleep(0.1)  # flaky is now backing off
+        assert await client.generate("steady") == "steady"
+        steady_seconds = time.monotonic() - started
+        assert await flaky == "flaky"
+        return steady_seconds
+
+    # With a single slot, "steady" would otherwise wait out both of flaky's backoffs
+    assert run_against(app, scenario, max_concurrency=1) < 0.5
+
+
+def test_waiting_for_a_rate_limit_does_not_hold_a_concurrency_slot():
+    async def scenario(client):
+        await client.generate("first")  # takes the key's only token
+        throttled = asyncio.ensure_future(client.generate("second"))
+        await asyncio.sleep(0.1)  # "second" now waits about a second for the next token
+        slot_free = not client._semaphore.locked()
+        await throttled
+        return slot_free
+
+    assert run_against(create_app(latency=0, jitter=0), scenario, max_concurrency=1, requests_per_minute=60)
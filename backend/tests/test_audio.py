@@ -0,0 +1,56 @@
+import wave
+from concurrent.futures import Future
+
+import pytest
+
+from jobs import JobCancelled
+
+
+class StuckFuture(Future):
+    """A pending future whose wait is interrupted, as when the render job is cancelled."""
+
+    def result(self, timeout=None):
+        raise JobCancelled()
+
+
+def failed_future():
+    future = Future()
+    future.set_exception(RuntimeError("engine crashed"))
+    return future
+
+
+def test_cancellation_during_a_retry_cancels_the_retried_future(ex_module, tmp_path, monkeypatch):
+    submitted = [failed_future(), StuckFuture()]
+    monkeypatch.setattr(ex_module, 'TTS_CACHE_ENABLED', False)
+    retry = submitted[1]
+    monkeypatch.setattr(ex_module.tts_pool, 'submit', lambda *args, **kwargs: submitted.pop(0))
+
+    segments = [{'speaker': 'host', 'text': "Welcome to the show."}]
+    with pytest.raises(JobCancelled):
+        list(ex_module.synthesize_segments(segments, str(tmp_path)))
+    assert retry.cancelled()
+
+
+def test_evicted_cached_segment_is_synthesized(ex_module, tmp_path, monkeypatch):
+    def submit(text, path, role, **settings):
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(16000)
+            f.writeframes(b'\x00\x01' * 1600)
+        future = Future()
+        future.set_result(path)
+        return future
+
+    monkeypatch.setattr(ex_module, 'TTS_CACHE_ENABLED', True)
+    monkeypatch.setattr(ex_module.tts_pool, 'voices', lambda: {'narrator': 'voice', 'host': 'voice'})
+    monkeypatch.setattr(ex_module.tts_pool, 'submit', submit)
+    # The cache had the segment when it was looked up, but it was evicted before being read
+    monkeypatch.setattr(ex_module.segment_cache, 'get', lambda key: str(tmp_path / "evicted.wav"))
+
+    metrics = {}
+    segments = [{'speaker': 'host', 'text': "Welcome to the show."}]
+    (segment, samples, sample_rate), = ex_module.synthesize_segments(segments, str(tmp_path), metrics=metrics)
+    assert sample_rate == 16000 and len(samples) == 1600
+    assert metrics['failed_segments'] == 0
+    assert metrics['cached_segments'] == 0
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+import pytest
+
+from doc_store import DocumentStore, document_id_for_text, is_document_id
+from vector_index import build_vector_index
+
+TEXT = "Dense retrieval maps questions and passages into one vector space."
+
+
+def build(text):
+    chunks = text.split(". ")
+    vectors = np.random.default_rng(len(chunks)).standard_normal((len(chunks), 8)).astype('float32')
+    return build_vector_index(vectors, mode="flat"), chunks
+
+
+def test_concurrent_registrations_build_once():
+    store = DocumentStore()
+    started, release = threading.Event(), threading.Event()
+    builds = []
+
+    def slow_build(text):
+        builds.append(text)
+        started.set()
+        release.wait(5)
+        return build(text)
+
+    threads = [threading.Thread(target=store.register, args=(TEXT, slow_build)) for _ in range(3)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(builds) == 1
+    assert store._build_locks == {}
+
+
+def test_failed_build_releases_its_lock():
+    store = DocumentStore()
+
+    def broken(text):
+        raise ValueError("no text")
+
+    with pytest.raises(ValueError):
+        store.register(TEXT, broken)
+    assert store._build_locks == {}
+    assert store.register(TEXT, build)['document_id'] == document_id_for_text(TEXT)
+
+
+def test_spilled_entry_is_found_by_id_only(tmp_path):
+    entry = DocumentStore(spill_dir=str(tmp_path)).register(TEXT, build)
+    reloaded = DocumentStore(spill_dir=str(tmp_path)).get(entry['document_id'])
+    assert reloaded['chunks'] == entry['chunks']
+    assert reloaded['index'].ntotal == len(entry['chunks'])
+
+
+def test_malformed_ids_never_reach_the_disk(tmp_path):
+    store = DocumentStore(spill_dir=str(tmp_path))
+    for document_id in ["../../etc/passwd", "A" * 64, document_id_for_text(TEXT) + "0"]:
+        assert not is_document_id(document_id)
+        assert store.get(document_id) is None
+        store.forget(document_id)
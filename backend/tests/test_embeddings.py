@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import BACKEND_DIR
+
+SENTENCES = [
+    "Transformers use self-attention to model long-range dependencies.",
+    "The proposed method reduces inference latency by 40% on CPU.",
+    "Short.",
+    "A much longer sentence that keeps going to exercise padding and bucketing across very "
+    "different token lengths in the same batch.",
+]
+
+
+@pytest.fixture(scope="module")
+def torch_embeddings():
+    pytest.importorskip("sentence_transformers")
+    from embedding_engine import load_embedding_model
+    try:
+        model = load_embedding_model("torch")
+    except Exception as e:  # weights not downloaded and no network
+        pytest.skip(f"PyTorch embedding model unavailable: {e}")
+    return np.asarray(model.encode(SENTENCES, batch_size=2), dtype="float32")
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(BACKEND_DIR, "onnx_model", "model.onnx")),
+                    reason="onnx_model/model.onnx not exported (run export_onnx.py)")
+@pytest.mark.parametrize("quantized, min_cosine", [(False, 0.999), (True, 0.98)])
+def test_onnx_matches_torch(torch_embeddings, quantized, min_cosine):
+    pytest.importorskip("onnxruntime")
+    from embedding_engine import load_embedding_model
+    onnx_embeddings = np.asarray(load_embedding_model("onnx", quantized=quantized).encode(SENTENCES, batch_size=2))
+
+    assert onnx_embeddings.shape == torch_embeddings.shape
+    # Both sides are L2-normalized, so the row-wise dot product is the cosine
+    cosines = (torch_embeddings * onnx_embeddings).sum(axis=1)
+    assert cosines.min() >= min_cosine
@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from jobs import JobManager, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED, report_progress
+
+SCRIPT = "Host: Welcome to the show about retrieval.\nExpert: Thanks, compression keeps recall high."
+
+
+@pytest.fixture
+def manager():
+    fakeredis = pytest.importorskip("fakeredis")
+    return JobManager(fakeredis.FakeRedis(), limits={'render': 1}, heartbeat_interval=0.05, stale_after=0.5)
+
+
+def test_audio_job_runs_in_a_worker_not_the_web_process(ex_module, client):
+    response = client.post('/jobs/audio', json={'podcast_script': SCRIPT + "\nHost: Job test."})
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['status'] == QUEUED
+    # Nothing runs it until a worker takes it
+    assert client.get(job['status_url']).get_json()['status'] == QUEUED
+
+    assert ex_module.job_manager.run_next(ex_module.JOB_RENDERERS, ['audio'], poll_timeout=0) == job['job_id']
+
+    done = client.get(job['status_url']).get_json()
+    assert done['status'] == SUCCEEDED, done
+    result = client.get(job['result_url'])
+    assert result.status_code == 200
+    assert result.data[:4] == b'RIFF'
+
+
+def test_invalid_job_input_is_rejected(client):
+    assert client.post('/jobs/audio', json={}).status_code == 400
+    assert client.post('/jobs/poem', json={}).status_code == 404
+
+
+def test_limit_holds_across_workers(manager):
+    job_id = manager.submit('render', {'n': 1})
+    # Another worker holds the only slot
+    assert manager._lease_slot('render') is not None
+    assert manager.run_next({'render': lambda params: params}, poll_timeout=0) is None
+    assert manager.get(job_id)['status'] == QUEUED
+
+
+def test_cancelled_queued_job_is_skipped(manager):
+    job_id = manager.submit('render', {'n': 1})
+    assert manager.cancel(job_id)['status'] == CANCELLED
+    ran = []
+    manager.run_next({'render': ran.append}, poll_timeout=0)
+    assert ran == []
+    assert manager.get(job_id)['status'] == CANCELLED
+
+
+def test_running_job_sees_cancellation(manager):
+    job_id = manager.submit('render', {})
+
+    def render(params):
+        manager.cancel(job_id)
+        time.sleep(1.1)  # cancel requests are checked at most once a second
+        report_progress(50)
+        return 'not reached'
+
+    manager.run_next({'render': render}, poll_timeout=0)
+    assert manager.get(job_id)['status'] == CANCELLED
+
+
+def test_heartbeat_keeps_a_long_job_alive(manager):
+    job_id = manager.submit('render', {})
+    seen = {}
+
+    def render(params):
+        time.sleep(1.0)  # twice stale_after
+        seen['status'] = manager.get(job_id)['status']
+        return {'ok': True}
+
+    manager.run_next({'render': render}, poll_timeout=0)
+    assert seen['status'] == RUNNING
+    assert manager.get(job_id)['result'] == {'ok': True}
+
+
+def test_orphaned_running_job_is_marked_failed(manager):
+    job_id = manager.submit('render', {})
+    # A worker took the job and was then killed: no more heartbeats
+    manager._update(job_id, status=RUNNING, started_at=time.time(), heartbeat_at=time.time() - 5)
+    record = manager.get(job_id)
+    assert record['status'] == FAILED
+    assert 'worker' in record['error']
+
+
+def test_worker_writes_do_not_drop_a_cancel_request(manager):
+    job_id = manager.submit('render', {})
+    manager._update(job_id, status=RUNNING, started_at=time.time(), heartbeat_at=time.time())
+    manager.cancel(job_id)
+    # The worker's heartbeat and progress writes land after the cancel
+    manager._update(job_id, heartbeat_at=time.time(), progress=40, message="Rendering")
+    record = manager.get(job_id)
+    assert record['cancel_requested'] is True
+    assert record['status'] == RUNNING and record['progress'] == 40
+
+
+def test_job_cancelled_while_being_claimed_does_not_run(manager):
+    job_id = manager.submit('render', {})
+    # The cancel request is stored, but its status change hasn't landed yet when a worker pops the job
+    manager.redis_client.set(manager._cancel_key(job_id), b"1")
+    ran = []
+    manager.run_next({'render': ran.append}, poll_timeout=0)
+    assert ran == []
+    assert manager.get(job_id)['status'] == QUEUED
+
+
+def test_reaping_does_not_overwrite_a_finished_job(manager):
+    job_id = manager.submit('render', {})
+    manager._update(job_id, status=RUNNING, started_at=time.time(), heartbeat_at=time.time() - 5)
+    stale = manager._load(job_id)
+    # The worker finishes between the web process reading the record and reaping it
+    manager._update(job_id, status=SUCCEEDED, result={'ok': True}, finished_at=time.time())
+    assert manager._reap(stale)['status'] == SUCCEEDED
+
+
+def test_job_reuses_a_synchronous_render(client):
+    body = {'podcast_script': SCRIPT + "\nHost: Rendered synchronously first."}
+    rendered = client.post('/generate-audio', json=body)
+    assert rendered.status_code == 200
+
+    response = client.post('/jobs/audio', json=body)
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job['status'] == SUCCEEDED and job['render_cache'] == 'hit'
+    assert job['result']['artifact_id'] == rendered.headers['X-Artifact-Id']
+    assert client.get(job['result_url']).data == rendered.data
+
+
+def test_synchronous_render_reuses_a_job(ex_module, client):
+    body = {'podcast_script': SCRIPT + "\nHost: Rendered as a job first."}
+    job = client.post('/jobs/audio', json=body).get_json()
+    ex_module.job_manager.run_next(ex_module.JOB_RENDERERS, ['audio'], poll_timeout=0)
+    artifact_id = client.get(job['status_url']).get_json()['result']['artifact_id']
+
+    rendered = client.post('/generate-audio', json=body)
+    assert rendered.headers['X-Render-Cache'] == 'hit'
+    assert rendered.headers['X-Artifact-Id'] == artifact_id
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from pipeline import Pipeline, StageError
+
+
+def test_independent_stages_run_concurrently():
+    def slow(value):
+        time.sleep(0.2)
+        return value
+
+    pipeline = (Pipeline(max_workers=4)
+                .add('a', lambda text: slow(text + "a"), ['text'])
+                .add('b', lambda text: slow(text + "b"), ['text'])
+                .add('joined', lambda a, b: a + b, ['a', 'b']))
+    started = time.perf_counter()
+    results, timings = pipeline.run({'text': "x"}, ['joined'])
+    assert results['joined'] == "xaxb"
+    assert time.perf_counter() - started < 0.35
+    assert set(timings) == {'a', 'b', 'joined', 'total_ms'}
+
+
+def test_failing_stage_does_not_wait_for_slow_siblings():
+    ran = []
+
+    def fail(text):
+        raise RuntimeError("model unavailable")
+
+    def slow(text):
+        time.sleep(1.0)
+        ran.append('slow')
+        return text
+
+    pipeline = (Pipeline(max_workers=2)
+                .add('slow', slow, ['text'])
+                .add('broken', fail, ['text'])
+                .add('after_slow', lambda slow: ran.append('after_slow'), ['slow']))
+    started = time.perf_counter()
+    with pytest.raises(StageError) as raised:
+        pipeline.run({'text': "x"})
+    assert time.perf_counter() - started < 0.5
+    assert raised.value.stage == 'broken'
+    time.sleep(1.0)
+    assert 'after_slow' not in ran  # nothing new starts after the failure
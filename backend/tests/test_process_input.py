@@ -0,0 +1,37 @@
+def test_default_outputs(client):
+    response = client.post('/process-input', json={
+        'input_type': 'Text',
+        'input_content': "Introduction\nWe study retrieval.\n\nMethod\nWe compress the index.\n\n"
+                         "Results\nRecall stays within one point while memory drops by 4x."
+    })
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    assert data['summary']
+    assert data['podcast_script']
+    assert data['ppt']['url'] == f"/artifacts/{data['ppt']['artifact_id']}"
+    assert set(data['timings']) >= {'summary', 'podcast_script', 'ppt_title', 'ppt'}
+
+    deck = client.get(data['ppt']['url'])
+    assert deck.status_code == 200
+    assert deck.data[:2] == b'PK'  # pptx is a zip archive
+
+
+def test_mcqs_only(client):
+    response = client.post('/process-input', json={
+        'input_type': 'Text',
+        'input_content': "Transformers use self-attention to model long-range dependencies.",
+        'outputs': ['mcqs'],
+        'num_questions': 2
+    })
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    assert 'podcast_script' not in data and 'ppt' not in data
+    assert data['mcqs_raw']
+
+
+def test_unknown_output_is_rejected(client):
+    response = client.post('/process-input', json={'input_type': 'Text', 'input_content': 'x',
+                                                    'outputs': ['poem']})
+    assert response.status_code == 400
@@ -0,0 +1,130 @@
+import json
+import hashlib
+
+import numpy as np
+import pytest
+
+from chunker import TokenChunker
+from embedding_codec import encode_embedding, decode_embedding
+from sparse_index import BM25Index, tokenize, fuse_rankings
+from vector_index import build_vector_index, search_index, recall_at_k
+
+DIM = 64
+
+PAPER = "\n\n".join([
+    "Introduction\nDense retrieval maps questions and passages into one vector space.",
+    "Method\nWe compress the index with product quantization and keep a small exact re-ranking stage.",
+    "Results\nRecall at ten stays within one point of the exact index while memory drops by four times.",
+    "Discussion\nLatency is dominated by the re-ranking stage on small corpora.",
+])
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words vectors standing in for the sentence-transformer model."""
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        vectors = np.zeros((len(texts), DIM), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in tokenize(text):
+                vectors[row, int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % DIM] += 1.0
+        return vectors
+
+
+@pytest.fixture
+def embedder(ex_module, monkeypatch):
+    monkeypatch.setattr(ex_module, 'embedding_model', HashingEmbedder())
+    ex_module.embedding_dim.cache_clear()
+    yield
+    ex_module.embedding_dim.cache_clear()
+
+
+def sse_events(body):
+    events = []
+    for message in body.decode('utf-8').strip().split("\n\n"):
+        event, data = message.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_chunks_cover_the_text_within_the_token_limit():
+    chunker = TokenChunker(max_tokens=24, overlap_tokens=6)
+    text = PAPER * 3
+    chunks = list(chunker.chunks(text))
+
+    assert len(chunks) > 3
+    assert all(chunk.tokens <= 24 for chunk in chunks)
+    assert [chunk.start for chunk in chunks] == sorted(chunk.start for chunk in chunks)
+    covered = np.zeros(len(text), dtype=bool)
+    for chunk in chunks:
+        covered[chunk.start:chunk.end] = True
+    assert all(covered[i] for i, char in enumerate(text) if not char.isspace())
+
+
+def test_embedding_codec_round_trips():
+    vector = np.random.default_rng(0).standard_normal(DIM).astype('float32')
+    assert np.array_equal(decode_embedding(encode_embedding(vector)), vector)
+    assert np.allclose(decode_embedding(encode_embedding(vector, 'float16')), vector, atol=1e-2)
+    assert np.allclose(decode_embedding(encode_embedding(vector, 'int8')), vector, atol=0.05)
+    assert decode_embedding(b"\x80\x04legacy pickle") is None
+
+
+@pytest.mark.parametrize("mode", ["flat", "hnsw"])
+def test_vector_index_finds_each_vector_itself(mode):
+    vectors = np.random.default_rng(1).standard_normal((500, DIM)).astype('float32')
+    index = build_vector_index(vectors, mode=mode)
+    _, ids = search_index(index, vectors[:1], 1)[0]
+    assert list(ids) == [0]
+    assert recall_at_k(index, vectors, vectors[:50], k=5) > 0.9
+
+
+def test_hybrid_fusion_keeps_exact_term_matches():
+    chunks = PAPER.split("\n\n")
+    bm25 = BM25Index.from_texts(chunks)
+    scores, ids = bm25.search("product quantization", top_k=3)
+    assert ids[0] == 1
+
+    dense = (np.array([0.9, 0.8]), np.array([3, 0]))
+    # Each retriever's best chunk beats the dense runner-up
+    assert set(fuse_rankings(dense, (scores, ids))[:2]) == {1, 3}
+
+
+def test_index_once_then_answer_by_id(client, embedder):
+    indexed = client.post('/rag-index', json={'document_text': PAPER})
+    assert indexed.status_code == 200, indexed.get_json()
+    document_id = indexed.get_json()['document_id']
+
+    question = {'document_id': document_id, 'query': "How much memory does quantization save?"}
+    first = client.post('/rag-answer', json=question).get_json()
+    assert first['document_id'] == document_id and first['answer'] and first['cached'] is None
+    again = client.post('/rag-answer', json=question).get_json()
+    assert again['cached'] == 'exact' and again['answer'] == first['answer']
+
+
+def test_unknown_or_malformed_document_id_needs_the_text(client, embedder):
+    for document_id in ["0" * 64, "../../etc/passwd"]:
+        response = client.post('/rag-answer', json={'document_id': document_id, 'query': "Anything?"})
+        assert response.status_code == 404
+
+
+def test_streamed_answer_sends_retrieval_tokens_and_done(client, embedder):
+    response = client.post('/rag-answer/stream', json={
+        'document_text': PAPER + "\n\nAppendix\nStreaming test.", 'query': "What dominates latency?"
+    })
+    assert response.status_code == 200
+    events = sse_events(response.data)
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == 'retrieval' and kinds[-1] == 'done' and 'token' in kinds
+    assert any("re-ranking" in chunk for chunk in events[0][1]['chunks'])
+    tokens = "".join(data['text'] for kind, data in events if kind == 'token')
+    assert tokens == events[-1][1]['answer']
+
+
+def test_cached_embeddings_expire(ex_module, embedder):
+    text = "A sentence that is embedded once and then read from Redis."
+    first = ex_module.get_embeddings_with_cache([text])[0]
+    key = ex_module.redis_key_for_text(text)
+    assert 0 < ex_module.redis_client.ttl(key) <= ex_module.EMBED_CACHE_TTL
+    assert np.array_equal(ex_module.get_embeddings_with_cache([text])[0], first)
@@ -0,0 +1,35 @@
+import os
+import sys
+import json
+import subprocess
+
+from conftest import BACKEND_DIR
+
+PROBE = """
+import json, sys
+import ex
+ex.create_app({roles!r})
+print(json.dumps({{
+    'rag_state': [name for name in ('document_store', 'corpus_manager', 'answer_cache')
+                  if getattr(ex, name) is not None],
+    'heavy': [name for name in ('faiss', 'tokenizers', 'torch', 'sentence_transformers') if name in sys.modules]
+}}))
+"""
+
+
+def run_app(roles):
+    """Create an app serving roles in a fresh interpreter; returns what it loaded."""
+    result = subprocess.run([sys.executable, "-c", PROBE.format(roles=roles)], capture_output=True, text=True,
+                            cwd=BACKEND_DIR, env=dict(os.environ), check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_auth_role_loads_no_rag_state():
+    loaded = run_app(['auth'])
+    assert loaded == {'rag_state': [], 'heavy': []}
+
+
+def test_rag_role_creates_its_state_without_loading_models():
+    loaded = run_app(['rag'])
+    assert loaded['rag_state'] == ['document_store', 'corpus_manager', 'answer_cache']
+    assert loaded['heavy'] == []
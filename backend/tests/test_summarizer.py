@@ -0,0 +1,80 @@
+import re
+
+from summarizer import split_sections, map_reduce_summarize, _split_body
+
+PAPER = """Efficient Retrieval for Long Papers
+
+Abstract
+We compress dense retrieval indexes. """ + "The abstract goes on. " * 30 + """
+
+1. Introduction
+""" + "Retrieval augmented generation needs fast search. " * 30 + """
+
+2. Method
+We quantize vectors with product quantization.
+
+3. Results
+""" + "Recall stays within one point while memory drops by four times. " * 30 + """
+
+References
+[1] A paper. [2] Another paper.
+"""
+
+
+class RecordingLLM:
+    """LLM gateway stand-in that answers each prompt with a formatted summary and records the calls."""
+
+    def __init__(self, reduce_reply="## Merged\n- merged point"):
+        self.mapped = []
+        self.reduced = []
+        self.reduce_reply = reduce_reply
+
+    def generate_many(self, prompts, prompt_type='default', max_workers=8):
+        self.mapped.extend(prompts)
+        return [f"- point {i}" for i in range(len(prompts))]
+
+    def generate(self, prompt, prompt_type='default'):
+        self.reduced.append(prompt)
+        return self.reduce_reply
+
+
+def test_split_body_keeps_text_in_order():
+    assert _split_body('AAAA\n\n' + 'B' * 25, 10) == ['AAAA', 'B' * 10, 'B' * 10, 'B' * 5]
+
+    body = "\n\n".join(["intro", "x" * 37, "middle paragraph", "y" * 12, "end"])
+    parts = _split_body(body, 15)
+    assert all(len(part) <= 15 for part in parts)
+    assert "".join(parts).replace("\n\n", "") == body.replace("\n\n", "")
+
+
+def test_split_sections_drops_references_and_bounds_parts():
+    sections = split_sections(PAPER, max_chars=1000, min_chars=200)
+    titles = [title for title, _ in sections]
+
+    assert not any(title.startswith("References") for title in titles)
+    # The short Method section is merged into Introduction rather than summarized alone
+    assert not any("Method" == title.split(". ")[-1] for title in titles)
+    assert any("product quantization" in body for _, body in sections)
+    assert all(len(body) <= 1000 for _, body in sections)
+    assert any(re.search(r"\(part \d+\)$", title) for title in titles)
+
+
+def test_map_reduce_summarizes_sections_in_order_then_merges():
+    llm = RecordingLLM()
+    summary = map_reduce_summarize(llm, PAPER, "Be brief.", max_section_chars=1000)
+
+    assert summary == "## Merged\n- merged point"
+    titles = [re.search(r'^Section "(.*)":$', prompt, re.MULTILINE).group(1) for prompt in llm.mapped]
+    assert titles == [title for title, _ in split_sections(PAPER, max_chars=1000)]
+    assert len(llm.reduced) == 1
+    # Map outputs are normalized to "## title" blocks, in section order
+    summaries = llm.reduced[0].split("Section summaries:")[1]
+    headings = re.findall(r"^## (.*)$", summaries, re.MULTILINE)
+    assert headings == titles
+
+
+def test_map_reduce_falls_back_to_section_summaries():
+    llm = RecordingLLM(reduce_reply="I could not merge these.")
+    summary = map_reduce_summarize(llm, PAPER, "Be brief.", max_section_chars=1000)
+    assert summary.startswith("## ")
+    assert summary.count("## ") == len(llm.mapped)
@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import wave
+import queue
+import itertools
+import threading
+import subprocess
+from concurrent.futures import Future
+
+# How each podcast role sounds; voice_index picks from the engine's voice list
+VOICE_PROFILES = {
+    'host': {'voice_index': 1, 'rate_offset': 0, 'volume': 0.9},       # usually a female voice
+    'expert': {'voice_index': 0, 'rate_offset': -20, 'volume': 0.95},  # slightly slower for authority
+    'narrator': {'voice_index': 0, 'rate_offset': 10, 'volume': 0.85}
+}
+
+
+class TTSEngineError(Exception):
+    pass
+
+
+def voice_profile(role, rate=150):
+    """Rate and volume for a podcast role at the given base rate."""
+    profile = VOICE_PROFILES.get(role, VOICE_PROFILES['narrator'])
+    return {'rate': rate + profile['rate_offset'], 'volume': profile['volume']}
+
+
+def resolve_voices(engine):
+    """Voice id of every role in VOICE_PROFILES, looked up once per engine."""
+    voices = engine.getProperty('voices')
+    if not voices:
+        raise TTSEngineError("No TTS voices available")
+    return {role: voices[p['voice_index'] if p['voice_index'] < len(voices) else 0].id
+            for role, p in VOICE_PROFILES.items()}
+
+
+def wait_for_wav(path, timeout=10.0, poll_interval=0.02):
+    """Block until path holds a complete WAV file and return its size in bytes.
+
+    Some drivers return from runAndWait() before the file is flushed, so a
+    file only counts as done once its size has stopped changing and all the
+    frames its header announces can be read.
+    """
+    deadline = time.monotonic() + timeout
+    last_size = -1
+    while True:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = -1
+        if size > 44 and size == last_size:
+            try:
+                with wave.open(path, 'rb') as f:
+                    expected = f.getnframes() * f.getsampwidth() * f.getnchannels()
+                    if expected and len(f.readframes(f.getnframes())) == expected:
+                        return size
+            except (wave.Error, EOFError, OSError):
+                pass
+        if time.monotonic() >= deadline:
+            raise TTSEngineError(f"Audio file {path} was not completed within {timeout}s")
+        last_size = size
+        time.sleep(poll_interval)
+
+
+def wav_duration(path):
+    with wave.open(path, 'rb') as f:
+        return f.getnframes() / float(f.getframerate())
+
+
+def available_cpus():
+    """CPUs this process may run on (respects affinity masks and container cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class _EngineProcess:
+    """One engine worker process, spoken to in JSON lines over its stdin/stdout."""
+
+    def __init__(self, start_timeout):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1
+        )
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read, name="tts-reader", daemon=True).start()
+        hello = self.receive(start_timeout)
+        if not hello.get('ready'):
+            self.kill()
+            raise TTSEngineError(f"TTS engine failed to start: {hello.get('error')}")
+        self.voices = hello['voices']
+
+    def send(self, message):
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise TTSEngineError(f"TTS engine process is gone: {e}")
+
+    def receive(self, timeout):
+        try:
+            reply = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            raise TTSEngineError(f"TTS engine did not answer within {timeout:.0f}s")
+        if reply is None:
+            raise TTSEngineError(f"TTS engine process exited with code {self.process.poll()}")
+        return reply
+
+    def stop(self, timeout=5):
+        try:
+            self.send({'op': 'stop'})
+            self.process.wait(timeout)
+        except (TTSEngineError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+
+    def _read(self):
+        for line in self.process.stdout:
+            try:
+                self._replies.put(json.loads(line))
+            except ValueError:
+                print(f"TTS engine: {line.rstrip()}")
+        self._replies.put(None)
+
+
+class TTSPool:
+    """Long-lived TTS engines in worker processes, fed through one task queue.
+
+    pyttsx3 is not thread-safe and slow to initialise, so each worker process
+    (one per available CPU by default) owns one engine for its lifetime,
+    with the voice of every podcast role resolved once at start-up. Tasks
+    run in parallel across the processes. A task that doesn't finish within its timeout
+    means the engine is wedged: its process is killed and restarted, and the
+    task fails with TTSEngineError. Processes are started on first use (and
+    again in a forked child), so the pool is safe to create at import time.
+    """
+
+    def __init__(self, size=None, task_timeout=60, start_timeout=30, seconds_per_char=0.05):
+        self.size = max(1, size or available_cpus())
+        self.task_timeout = task_timeout
+        self.start_timeout = start_timeout
+        self.seconds_per_char = seconds_per_char
+        self._lock = threading.Lock()
+        self._pid = None
+        self._tasks = None
+        self._slots = []
+        self._voices = None
+        self._ids = itertools.count()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'restarts': 0}
+
+    # --- public API ---
+
+    def start(self):
+        """Start every engine process now (e.g. during warm-up) and return the pool."""
+        self._ensure_started()
+        starters = [threading.Thread(target=self._start_slot, args=(slot,)) for slot in self._slots]
+        for starter in starters:
+            starter.start()
+        for starter in starters:
+            starter.join()
+        self.voices()
+        return self
+
+    def submit(self, text, output_path, role='narrator', rate=150, volume=1.0):
+        """Queue text for synthesis into the WAV file output_path.
+
+        Returns a Future resolving to {'path', 'bytes', 'audio_seconds', 'seconds'}.
+        """
+        self._ensure_started()
+        future = Future()
+        task = {'id': next(self._ids), 'text': text, 'path': output_path, 'role': role,
+                'rate': rate, 'volume': volume}
+        with self._lock:
+            self._stats['submitted'] += 1
+        self._tasks.put((task, future))
+        return future
+
+    def synthesize(self, text, output_path, role='narrator', rate=150, volume=1.0):
+        return self.submit(text, output_path, role, rate, volume).result()
+
+    def voices(self):
+        """Voice id used for each role, as resolved by the engines."""
+        if self._voices is None:
+            self._ensure_started()
+            slot = self._slots[0]
+            with slot['lock']:
+                self._engine(slot)
+        return dict(self._voices)
+
+    def close(self, timeout=5):
+        """Drain: let queued tasks finish, then stop every engine process."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            slots, self._pid = self._slots, None
+        for _ in slots:
+            self._tasks.put(None)
+        for slot in slots:
+            slot['thread'].join()
+            if slot['engine'] is not None:
+                slot['engine'].stop(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['size'] = self.size
+        stats['queued'] = self._tasks.qsize() if self._tasks is not None else 0
+        stats['running'] = sum(1 for slot in self._slots if slot['engine'] is not None)
+        return stats
+
+    # --- internals ---
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # First use, or a forked child: the parent's processes and threads aren't ours
+            self._pid = os.getpid()
+            self._tasks = queue.Queue()
+            self._slots = []
+            for i in range(self.size):
+                slot = {'engine': None, 'lock': threading.Lock()}
+                slot['thread'] = threading.Thread(target=self._serve, args=(slot, self._tasks),
+                                                  name=f"tts-slot-{i}", daemon=True)
+                self._slots.append(slot)
+                slot['thread'].start()
+
+    def _engine(self, slot):
+        if slot['engine'] is None:
+            slot['engine'] = _EngineProcess(self.start_timeout)
+            self._voices = slot['engine'].voices
+        return slot['engine']
+
+    def _start_slot(self, slot):
+        with slot['lock']:
+            try:
+                self._engine(slot)
+            except TTSEngineError as e:
+                print(f"Warning: {e}")
+
+    def _serve(self, slot, tasks):
+        while True:
+            item = tasks.get()
+            if item is None:
+                return
+            task, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            with slot['lock']:
+                try:
+                    result = self._run(slot, task)
+                except Exception as e:
+                    self._count('failed')
+                    future.set_exception(e)
+                else:
+                    self._count('completed')
+                    future.set_result(result)
+
+    def _run(self, slot, task):
+        engine = self._engine(slot)
+        timeout = self.task_timeout + len(task['text']) * self.seconds_per_char
+        try:
+            engine.send(task)
+            reply = engine.receive(timeout)
+        except TTSEngineError:
+            # Wedged or dead: replace the process so the next task gets a fresh engine
+            engine.kill()
+            slot['engine'] = None
+            self._count('restarts')
+            raise
+        if not reply.get('ok'):
+            raise TTSEngineError(reply.get('error') or "TTS synthesis failed")
+        return {'path': reply['path'], 'bytes': reply['bytes'], 'audio_seconds': reply['audio_seconds'],
+                'seconds': reply['seconds']}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+
+def _load_engine():
+    if os.getenv("TTS_BACKEND", "pyttsx3") == "fake":
+        from fake_tts import FakeTTSEngine
+        return FakeTTSEngine()
+    import pyttsx3
+    return pyttsx3.init()
+
+
+def _worker_main():
+    """Engine process: one engine, tasks in on stdin, replies out on stdout."""
+    protocol = os.fdopen(os.dup(1), 'w', buffering=1)
+    os.dup2(2, 1)  # stray prints from speech drivers must not corrupt the protocol
+
+    def reply(**message):
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    try:
+        engine = _load_engine()
+        voices = resolve_voices(engine)
+    except Exception as e:
+        reply(ready=False, error=str(e))
+        return 1
+    reply(ready=True, voices=voices)
+
+    current = {}
+    for line in sys.stdin:
+        task = json.loads(line)
+        if task.get('op') == 'stop':
+            break
+        started = time.perf_counter()
+        partial = task['path'] + ".part.wav"
+        try:
+            settings = {'voice': voices.get(task['role'], voices['narrator']),
+                        'rate': task['rate'], 'volume': task['volume']}
+            for name, value in settings.items():
+                if current.get(name) != value:
+                    engine.setProperty(name, value)
+                    current[name] = value
+            engine.save_to_file(task['text'], partial)
+            engine.runAndWait()
+            size = wait_for_wav(partial)
+            os.replace(partial, task['path'])  # readers never see a partial file
+            reply(id=task['id'], ok=True, path=task['path'], bytes=size,
+                  audio_seconds=round(wav_duration(task['path']), 3),
+                  seconds=round(time.perf_counter() - started, 3))
+        except Exception as e:
+            reply(id=task['id'], ok=False, error=str(e))
+    return 0
+
+
+if __name__ == "__main__" and "--worker" in sys.argv:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(_worker_main())
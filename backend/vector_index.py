@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+
+from lazy import lazy_import
+
+# Loaded on first use, so importing the app doesn't load faiss
+faiss = lazy_import("faiss")
+
+INDEX_MODES = ("auto", "flat", "hnsw", "ivfpq")
+
+
+def normalize_rows(vectors):
+    """Return a float32, L2-normalized copy so inner product equals cosine similarity."""
+    vectors = np.array(vectors, dtype="float32", copy=True, ndmin=2)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def choose_index_mode(num_vectors, flat_max=20000, hnsw_max=200000):
+    """Pick an index type for a corpus size: exact scan while cheap, graph or compressed beyond that."""
+    if num_vectors <= flat_max:
+        return "flat"
+    if num_vectors <= hnsw_max:
+        return "hnsw"
+    return "ivfpq"
+
+
+def build_vector_index(embeddings, mode="auto", flat_max=20000, hnsw_max=200000,
+                       hnsw_m=32, ef_construction=200, ef_search=64, nlist=None, nprobe=16, pq_m=None,
+                       refine_k_factor=8):
+    """Build a cosine-similarity FAISS index over embeddings.
+
+    mode is one of INDEX_MODES; "auto" switches from flat to HNSW to IVF-PQ
+    as the number of vectors crosses flat_max and hnsw_max. IVF-PQ results
+    are re-ranked exactly over refine_k_factor * k candidates (0 disables).
+    """
+    if mode not in INDEX_MODES:
+        raise ValueError(f"Unknown index mode: {mode}")
+    vectors = normalize_rows(embeddings)
+    num_vectors, dim = vectors.shape
+    if mode == "auto":
+        mode = choose_index_mode(num_vectors, flat_max, hnsw_max)
+
+    if mode == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        index.hnsw.efSearch = ef_search
+        index.add(vectors)
+        return index
+
+    if mode == "ivfpq":
+        nlist = nlist or max(1, int(4 * math.sqrt(num_vectors)))
+        # k-means needs a few dozen points per centroid; fall back to exact search on tiny inputs
+        if num_vectors < 39 * nlist:
+            return build_vector_index(vectors, mode="flat")
+        pq_m = pq_m or _default_pq_m(dim)
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, 8, faiss.METRIC_INNER_PRODUCT)
+        train_size = min(num_vectors, 256 * nlist)
+        sample = vectors[np.random.default_rng(0).choice(num_vectors, train_size, replace=False)]
+        index.train(sample)
+        index.nprobe = nprobe
+        if refine_k_factor:
+            index = faiss.IndexRefineFlat(index)
+            index.k_factor = refine_k_factor
+        index.add(vectors)
+        return index
+
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    return index
+
+
+def tune_index(index, nprobe=None, ef_search=None):
+    """Apply search-time knobs to an index (e.g. one loaded back from Redis)."""
+    if nprobe is not None:
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = nprobe
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def search_index(index, query_embeddings, top_k):
+    """Search with cosine similarity; returns (scores, ids) with -1 padding removed per row."""
+    scores, ids = index.search(normalize_rows(query_embeddings), top_k)
+    results = []
+    for row_scores, row_ids in zip(scores, ids):
+        keep = row_ids >= 0
+        results.append((row_scores[keep], row_ids[keep]))
+    return results
+
+
+def recall_at_k(index, embeddings, queries, k=10):
+    """Fraction of the exact top-k neighbours (flat inner product) that index also returns."""
+    baseline = build_vector_index(embeddings, mode="flat")
+    queries = normalize_rows(queries)
+    _, exact = baseline.search(queries, k)
+    _, approx = index.search(queries, k)
+    hits = sum(len(set(e[e >= 0]) & set(a[a >= 0])) for e, a in zip(exact, approx))
+    return hits / float((exact >= 0).sum() or 1)
+
+
+def _default_pq_m(dim):
+    # Largest sub-quantizer count <= dim / 4 that divides dim (384 -> 96 bytes per vector)
+    for m in range(max(1, dim // 4), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
@@ -0,0 +1,7 @@
+"""WSGI entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+SERVICE_ROLES (e.g. "auth" or "rag,llm-text") selects the routes this replica serves.
+"""
+from ex import create_app
+
+app = create_app(preload=True)
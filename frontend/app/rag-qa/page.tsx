@@ -16,11 +16,14 @@ export default function RAGQAPage() {
   const [answer, setAnswer] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  // Id of the indexed document on the backend, so follow-up questions skip re-indexing
+  const [documentId, setDocumentId] = useState<string | null>(null);
 
   // Handle PDF upload and extract text
   const handleFileUpload = async (file: File | null) => {
     setPdfFile(file);
     setInputText(""); // Clear text input if PDF is uploaded
+    setDocumentId(null);
     if (file) {
       const formData = new FormData();
       formData.append("pdf", file);
@@ -50,17 +53,53 @@ export default function RAGQAPage() {
     setError("");
     setAnswer("");
     try {
-      const res = await fetch("http://localhost:5000/rag-answer", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          document_text: inputText,
-          query,
-        }),
-      });
-      const data = await res.json();
-      if (data.answer) setAnswer(data.answer);
-      else setError(data.error || "No answer found.");
+      const ask = (payload: Record<string, string>) =>
+        fetch("http://localhost:5000/rag-answer/stream", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ ...payload, query }),
+        });
+      // Follow-up questions only send the document id; resend the text if the backend forgot it
+      let res = documentId
+        ? await ask({ document_id: documentId })
+        : await ask({ document_text: inputText });
+      if (res.status === 404 && documentId) {
+        res = await ask({ document_text: inputText });
+      }
+      if (!res.ok || !res.body) {
+        const data = await res.json();
+        setError(data.error || "No answer found.");
+        setLoading(false);
+        return;
+      }
+      // Server-Sent Events: "retrieval", then "token"s as the model writes, then "done"
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let received = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() || "";
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const payload = raw.match(/^data: (.*)$/m)?.[1];
+          if (!event || !payload) continue;
+          const data = JSON.parse(payload);
+          if (event === "retrieval") {
+            setDocumentId(data.document_id);
+          } else if (event === "token") {
+            received += data.text;
+            setAnswer(received);
+            setLoading(false);
+          } else if (event === "error") {
+            setError(data.error || "No answer found.");
+          }
+        }
+      }
+      if (!received) setError((prev) => prev || "No answer found.");
     } catch {
       setError("Server error.");
     }
@@ -160,7 +199,10 @@ export default function RAGQAPage() {
                     rows={8}
                     placeholder="Paste your research paper or content here..."
                     value={inputText}
-                    onChange={(e) => setInputText(e.target.value)}
+                    onChange={(e) => {
+                      setInputText(e.target.value);
+                      setDocumentId(null);
+                    }}
                   />
                   <div className="text-xs text-gray-600 mt-1">
                     Pro tip: The more content you provide, the richer the
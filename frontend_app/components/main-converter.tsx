@@ -1,6 +1,6 @@
 "use client";
 import Link from "next/link";
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { InputSection } from "./input-section";
 import { OptionsSection } from "./options-section";
 import { ResultsSection } from "./results-section";
@@ -46,12 +46,113 @@ export interface GeneratedContent {
   videoUrl?: string;
 }
 
+// Plays the podcast through Web Audio while /generate-audio/stream is still
+// synthesizing it, and resolves to the complete WAV once the stream ends.
+async function streamPodcastAudio(
+  podcastScript: string,
+  audioContext: AudioContext
+): Promise<Blob> {
+  const response = await fetch(
+    "http://127.0.0.1:5000/generate-audio/stream",
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        podcast_script: podcastScript,
+      }),
+      mode: "cors",
+    }
+  );
+
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.error || "Failed to generate audio");
+  }
+
+  // 16-bit PCM WAV: a 44-byte header, then interleaved samples. While
+  // streaming, the header's length fields are left open-ended.
+  const reader = response.body.getReader();
+  const chunks: Uint8Array[] = [];
+  let pending = new Uint8Array(0);
+  let channels = 0;
+  let sampleRate = 0;
+  let playAt = 0;
+
+  const play = (bytes: Uint8Array) => {
+    const frames = bytes.length / (2 * channels);
+    const samples = new DataView(bytes.buffer, bytes.byteOffset, bytes.length);
+    const buffer = audioContext.createBuffer(channels, frames, sampleRate);
+    for (let c = 0; c < channels; c++) {
+      const data = buffer.getChannelData(c);
+      for (let i = 0; i < frames; i++) {
+        data[i] = samples.getInt16((i * channels + c) * 2, true) / 32768;
+      }
+    }
+    const source = audioContext.createBufferSource();
+    source.buffer = buffer;
+    source.connect(audioContext.destination);
+    // Queue right after what is already scheduled, so the pieces play gaplessly
+    playAt = Math.max(playAt, audioContext.currentTime + 0.05);
+    source.start(playAt);
+    playAt += buffer.duration;
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (value) {
+      chunks.push(value);
+      const joined = new Uint8Array(pending.length + value.length);
+      joined.set(pending);
+      joined.set(value, pending.length);
+      pending = joined;
+    }
+    if (!channels && pending.length >= 44) {
+      const header = new DataView(pending.buffer, pending.byteOffset, 44);
+      channels = header.getUint16(22, true);
+      sampleRate = header.getUint32(24, true);
+      pending = pending.slice(44);
+    }
+    if (channels) {
+      // Schedule whole frames in pieces of at least a quarter second
+      const frameBytes = 2 * channels;
+      const usable = pending.length - (pending.length % frameBytes);
+      if (usable > 0 && (done || usable >= sampleRate * frameBytes * 0.25)) {
+        play(pending.subarray(0, usable));
+        pending = pending.slice(usable);
+      }
+    }
+    if (done) break;
+  }
+
+  // Fill in the real lengths so the saved file is a regular WAV
+  const wav = new Uint8Array(chunks.reduce((total, c) => total + c.length, 0));
+  let offset = 0;
+  for (const chunk of chunks) {
+    wav.set(chunk, offset);
+    offset += chunk.length;
+  }
+  if (wav.length >= 44) {
+    const header = new DataView(wav.buffer);
+    header.setUint32(4, wav.length - 8, true);
+    header.setUint32(40, wav.length - 44, true);
+  }
+  return new Blob([wav], { type: "audio/wav" });
+}
+
 export function MainConverter() {
   const { logout } = useAuth();
   const router = useRouter();
   const { toast } = useToast();
 
+  const audioContextRef = useRef<AudioContext | null>(null);
+
+  const stopPodcastPlayback = () => {
+    audioContextRef.current?.close();
+    audioContextRef.current = null;
+  };
+
   const handleLogout = () => {
+    stopPodcastPlayback();
     logout();
     router.push("/landing");
   };
@@ -204,6 +305,11 @@ export function MainConverter() {
       return;
     }
 
+    // Created inside the click handler, so the browser lets it play later on
+    stopPodcastPlayback();
+    const audioContext = new AudioContext();
+    audioContextRef.current = audioContext;
+
     setIsLoading(true);
 
     try {
@@ -275,6 +381,10 @@ export function MainConverter() {
 
       const { podcast_script: podcastScript } = await podcastResponse.json();
 
+      // Start the podcast now: it plays as it is synthesized, alongside the other renders
+      const audioBlobPromise = streamPodcastAudio(podcastScript, audioContext);
+      audioBlobPromise.catch(() => {}); // awaited below; don't report it unhandled if the PPT fails first
+
       const templateNameMap = {
         template1: "Template 1",
         template2: "Template 2",
@@ -300,25 +410,8 @@ export function MainConverter() {
       const blob = await pptResponse.blob();
       const powerpointUrl = URL.createObjectURL(blob);
 
-      // Generate audio
-      const audioResponse = await fetch(
-        "http://127.0.0.1:5000/generate-audio",
-        {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({
-            podcast_script: podcastScript,
-          }),
-          mode: "cors",
-        }
-      );
-
-      if (!audioResponse.ok) {
-        const errorData = await audioResponse.json().catch(() => ({}));
-        throw new Error(errorData.error || "Failed to generate audio");
-      }
-
-      const audioBlob = await audioResponse.blob();
+      // Finish the audio
+      const audioBlob = await audioBlobPromise;
       const podcastAudioUrl = URL.createObjectURL(audioBlob);
 
       // Generate video (optional)
@@ -359,6 +452,7 @@ export function MainConverter() {
         description: "Scroll down to view your generated content.",
       });
     } catch (error) {
+      stopPodcastPlayback();
       toast({
         title: "Error generating content",
         description: "Please try again later.",